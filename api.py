@@ -0,0 +1,221 @@
+# api.py
+"""
+Read-only JSON API over the fuel price store, as a plain ASGI application.
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Endpoints (GET or HEAD):
+    /latest   [?city=&fuel=]                 latest price per series
+    /history  ?city=&fuel=[&days=][&points=] date/price points, downsampled like the dashboard chart
+    /trend    [?city=&fuel=]                 trend verdict over the last TREND_DAYS days
+
+Every response carries an ETag; a matching If-None-Match gets 304 Not Modified.
+"""
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from chart_data import HISTORY_DAYS, LTTB_INPUT_LIMIT, POINT_BUDGET, ChartData
+from data_cache import DataCache
+from series_index import SeriesIndex
+from storage import get_store
+from trends import TREND_DAYS, compute_trends
+
+REFRESH_INTERVAL = 1.0      # Seconds between data file version checks
+CACHE_SIZE = 1024           # /history responses kept in the LRU cache
+MAX_AGE = 60                # Cache-Control max-age for clients and proxies, in seconds
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode(payload):
+    """
+    Serializes a response payload once and derives its ETag from the bytes.
+    """
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"', body
+
+
+def number(value):
+    """
+    JSON-safe float (NaN becomes null).
+    """
+    value = float(value)
+    return None if math.isnan(value) else round(value, 4)
+
+
+class PriceApi:
+    """
+    ASGI application serving prices from an in-memory copy of the store.
+
+    The store's version is checked at most every REFRESH_INTERVAL seconds.
+    When it changes, the data is reloaded through DataCache (only appended CSV
+    rows are parsed) and every /latest and /trend response is rebuilt and
+    encoded up front; /history responses, which depend on query parameters,
+    are built on first request and kept in an LRU cache for the data version.
+    Serving a request is then a dict lookup and a send of ready-made bytes.
+    """
+
+    def __init__(self, store=None, history_days=HISTORY_DAYS, cache_size=CACHE_SIZE):
+        self.data = DataCache(store or get_store(), history_days)
+        self.cache_size = cache_size
+        self.version = object()  # Never equal to a real version, so the first request loads
+        self.index = self.chart_data = self.trends = None
+        self.hits = self.misses = 0
+        self._checked = None
+        self._static = {}
+        self._history = OrderedDict()
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < REFRESH_INTERVAL:
+            return
+        self._checked = now
+        version, df = self.data.refresh()
+        if version == self.version:
+            return
+        self.index = SeriesIndex(df)
+        self.chart_data = ChartData(self.index)
+        self.trends = compute_trends(df, days=TREND_DAYS)
+        self._history.clear()
+        self._static = self._precompute()
+        self.version = version
+
+    # --- Payloads ---
+
+    def _latest(self, city, fuel_type):
+        price, date = self.index.latest(city, fuel_type)
+        return {'city': city, 'fuel_type': fuel_type, 'price': number(price), 'date': date.strftime('%Y-%m-%d')}
+
+    def _trend(self, city, fuel_type):
+        row = self.trends.loc[(city, fuel_type)]
+        return {
+            'city': city,
+            'fuel_type': fuel_type,
+            'days': TREND_DAYS,
+            'trend': row['trend'],
+            'start_date': row['start_date'].strftime('%Y-%m-%d'),
+            'end_date': row['end_date'].strftime('%Y-%m-%d'),
+            'start_price': number(row['start_price']),
+            'end_price': number(row['end_price']),
+            'observations': int(row['observations']),
+            'span_days': int(row['span_days']),
+            'price_change': number(row['price_change']),
+            'avg_daily_change': number(row['avg_daily_change']),
+            'volatility': number(row['volatility']),
+        }
+
+    def _precompute(self):
+        """
+        Builds every /latest and /trend response for the current data, keyed
+        by (path, city, fuel_type); None stands for "all".
+        """
+        keys = self.index.keys()
+        payloads = {}
+        for path, build in (('/latest', self._latest), ('/trend', self._trend)):
+            items = [build(city, fuel_type) for city, fuel_type in keys]
+            payloads[(path, None, None)] = items
+            for item in items:
+                payloads[(path, item['city'], item['fuel_type'])] = item
+            for city in self.index.cities:
+                payloads[(path, city, None)] = [item for item in items if item['city'] == city]
+            for fuel_type in self.index.fuel_types:
+                payloads[(path, None, fuel_type)] = [item for item in items if item['fuel_type'] == fuel_type]
+        return {key: encode(payload) for key, payload in payloads.items()}
+
+    def _history_response(self, city, fuel_type, days, points):
+        cache_key = (city, fuel_type, days, points)
+        response = self._history.get(cache_key)
+        if response is not None:
+            self._history.move_to_end(cache_key)
+            self.hits += 1
+            return response
+        self.misses += 1
+        if self.index.latest(city, fuel_type) is None:
+            raise ApiError(404, f"No data for {fuel_type} in {city}")
+        prices = self.chart_data.series(city, fuel_type, days=days, points=points)
+        response = encode({
+            'city': city,
+            'fuel_type': fuel_type,
+            'points': [[date.strftime('%Y-%m-%d'), number(price)] for date, price in prices.items()],
+        })
+        self._history[cache_key] = response
+        if len(self._history) > self.cache_size:
+            self._history.popitem(last=False)
+        return response
+
+    # --- Routing ---
+
+    def route(self, path, query):
+        """
+        Returns (etag, body) for a request, or raises ApiError.
+        """
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        city, fuel_type = params.get('city'), params.get('fuel')
+
+        if path in ('/latest', '/trend'):
+            response = self._static.get((path, city, fuel_type))
+            if response is None:
+                raise ApiError(404, f"No data for city={city!r}, fuel={fuel_type!r}")
+            self.hits += 1
+            return response
+
+        if path == '/history':
+            if city is None or fuel_type is None:
+                raise ApiError(400, "/history needs both city and fuel")
+            try:
+                days = int(params['days']) if 'days' in params else None
+                points = int(params.get('points', POINT_BUDGET))
+            except ValueError:
+                raise ApiError(400, "days and points must be integers")
+            if (days is not None and days < 1) or not 3 <= points <= LTTB_INPUT_LIMIT:
+                raise ApiError(400, f"days must be positive and points between 3 and {LTTB_INPUT_LIMIT}")
+            return self._history_response(city, fuel_type, days, points)
+
+        raise ApiError(404, f"Unknown path {path}")
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    self.refresh()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        method = scope['method']
+        if method not in ('GET', 'HEAD'):
+            status, etag, body = 405, None, encode({'error': "Only GET and HEAD are supported"})[1]
+        else:
+            try:
+                self.refresh()
+                etag, body = self.route(scope['path'], scope['query_string'].decode('latin-1'))
+                status = 200
+            except ApiError as e:
+                status, etag, body = e.status, None, encode({'error': str(e)})[1]
+
+        headers = [(b'content-type', b'application/json; charset=utf-8')]
+        if etag is not None:
+            headers += [(b'etag', etag.encode()), (b'cache-control', f'public, max-age={MAX_AGE}'.encode())]
+            if_none_match = dict(scope['headers']).get(b'if-none-match', b'').decode('latin-1')
+            if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+                status, body = 304, b''
+        if status != 304:
+            headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if method == 'HEAD' or status == 304 else body})
+
+
+# Module-level application for ASGI servers
+app = PriceApi()
@@ -1,55 +1,109 @@
 # app.py
+import time
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import os
 
-# Define the CSV file where fuel price data is stored
-FUEL_DATA_FILE = 'fuel_prices.csv'
+from chart_data import CHART_RANGES, HISTORY_DAYS, ChartData
+from data_cache import DataCache
+from profiling import PROFILE_ENABLED, PROFILERS, RerunProfiler, app_timings, stage
+from series_index import SeriesIndex
+from snapshot import SNAPSHOT_FILE, data_fingerprint, open_snapshot
+from storage import file_version, get_store
+from trends import compute_trends, DAILY_CHANGE_THRESHOLD, TREND_DAYS
 
-@st.cache_data # Cache data loading to improve performance
-def load_data():
+# Derived structures are cached per data version; keep the current one and the
+# one before it (sessions mid-rerun may still use it), and drop idle entries
+CACHE_ENTRIES = 2
+CACHE_TTL = timedelta(hours=6)
+
+@st.cache_resource # One in-memory copy of the recent history, shared by every session
+def get_data_cache(history_days=HISTORY_DAYS):
+    return DataCache(get_store(), history_days)
+
+def load_data(history_days=HISTORY_DAYS):
+    """
+    Returns (version, df): the last `history_days` of fuel price data from the
+    configured store (fuel_prices.csv by default), or the full history when
+    nothing recent exists. Each call checks the data file's version and picks
+    up rows the daily job appended, parsing only those; `version` changes
+    whenever the data does, so caches keyed on it never serve stale data.
+    Returns an empty DataFrame if there is no data yet.
+    """
+    try:
+        return get_data_cache(history_days).refresh()
+    except Exception as e:
+        st.error(f"Error loading fuel price data: {e}")
+        return None, pd.DataFrame(columns=['Date', 'City', 'FuelType', 'Price'])
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL) # Mapped once per snapshot file and data fingerprint
+def load_snapshot(snapshot_version, fingerprint):
+    """
+    Opens the daily job's snapshot if it was built from the current data with
+    this app's chart ranges and trend window, else returns None.
+    """
+    snapshot = open_snapshot(fingerprint, SNAPSHOT_FILE)
+    if snapshot is None or not snapshot.matches():
+        return None
+    return snapshot
+
+def get_snapshot():
     """
-    Loads fuel price data from the CSV file.
-    Returns an empty DataFrame if the file does not exist.
+    Returns the up-to-date snapshot, or None when the data has changed since
+    it was built (or there is none). Checking costs a stat() of the snapshot
+    and a hash of the last few KB of the data file.
     """
-    if os.path.exists(FUEL_DATA_FILE):
-        try:
-            df = pd.read_csv(FUEL_DATA_FILE)
-            df['Date'] = pd.to_datetime(df['Date']) # Convert 'Date' column to datetime objects
-            return df.sort_values('Date').reset_index(drop=True) # Sort by date and reset index
-        except Exception as e:
-            st.error(f"Error loading data from {FUEL_DATA_FILE}: {e}")
-            return pd.DataFrame(columns=['Date', 'City', 'FuelType', 'Price'])
-    return pd.DataFrame(columns=['Date', 'City', 'FuelType', 'Price'])
+    try:
+        return load_snapshot(file_version(SNAPSHOT_FILE), data_fingerprint(get_data_cache(HISTORY_DAYS).store))
+    except Exception:
+        return None
 
-def analyze_trend(df, city, fuel_type, days=7):
+@st.cache_resource(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL) # Shared read-only index; skips cache_data's copy of the frame on every rerun
+def load_index(version, _df):
+    """
+    Builds the (City, FuelType) lookup index over the loaded data once per data version.
+    The frame is keyed by `version` only (Streamlit doesn't hash _-prefixed arguments).
+    """
+    return SeriesIndex(_df)
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL) # Verdicts for every series, computed in one vectorized pass per data version
+def load_trends(version, _df, days=TREND_DAYS):
+    """
+    Builds the trend table for all (City, FuelType) series.
+    """
+    return compute_trends(_df, days=days)
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL) # Daily/weekly/monthly aggregates, built once per data version
+def load_chart_data(version, _index):
+    """
+    Builds the downsampled chart series over the index.
     """
-    Analyzes the price trend for a given city and fuel type over the last 'days'.
+    return ChartData(_index)
+
+def analyze_trend(trends, city, fuel_type, days=TREND_DAYS):
+    """
+    Describes the precomputed price trend for a given city and fuel type over the last 'days'.
     Generates a human-readable summary and a refueling suggestion.
     """
-    # Filter data for the specific city and fuel type, and take the last 'days' entries
-    filtered_df = df[(df['City'] == city) & (df['FuelType'] == fuel_type)].tail(days)
-    
-    if len(filtered_df) < 2:
-        return "Not enough historical data for a meaningful trend analysis. Please check back later."
+    try:
+        trend = trends.loc[(city, fuel_type)]
+    except KeyError:
+        trend = None
 
-    # Calculate price change from the first to the last available day in the window
-    start_price = filtered_df.iloc[0]['Price']
-    end_price = filtered_df.iloc[-1]['Price']
-    price_change = end_price - start_price
+    if trend is None or trend['trend'] == 'insufficient':
+        return "Not enough historical data for a meaningful trend analysis. Please check back later."
 
-    # Calculate average price change per day
-    avg_daily_change = price_change / (len(filtered_df) - 1) if len(filtered_df) > 1 else 0
+    price_change = trend['price_change']
+    avg_daily_change = trend['avg_daily_change'] if pd.notna(trend['avg_daily_change']) else 0
 
-    # Determine trend and suggestion based on price change thresholds
+    # Turn the verdict into a summary and suggestion
     trend_summary = ""
     refuel_suggestion = ""
 
-    if price_change > 0.50: # Significant increase threshold
+    if trend['trend'] == 'increasing':
         trend_summary = f"{fuel_type} prices in {city} increased by ₹{price_change:.2f} over the last {days} days."
         refuel_suggestion = "It's advisable to refuel soon as prices are likely to continue rising."
-    elif price_change < -0.50: # Significant decrease threshold
+    elif trend['trend'] == 'decreasing':
         trend_summary = f"{fuel_type} prices in {city} decreased by ₹{-price_change:.2f} over the last {days} days."
         refuel_suggestion = "Prices might drop further. Consider waiting a bit before refueling in bulk."
     else:
@@ -57,7 +111,7 @@ def analyze_trend(df, city, fuel_type, days=7):
         refuel_suggestion = "Prices are stable. Refuel as needed without urgency."
     
     # Add a note about daily change if significant
-    if abs(avg_daily_change) > 0.05: # Threshold for noticeable daily change
+    if abs(avg_daily_change) > DAILY_CHANGE_THRESHOLD: # Threshold for noticeable daily change
         if avg_daily_change > 0:
             trend_summary += f" (Average daily increase: ₹{avg_daily_change:.2f})"
         else:
@@ -65,6 +119,38 @@ def analyze_trend(df, city, fuel_type, days=7):
 
     return f"{trend_summary}\n\n**Refueling Suggestion:** {refuel_suggestion}"
 
+def render_debug_panel(snapshot):
+    """
+    Sidebar panel shown when FUEL_PROFILE is set: load_data cache hits and
+    reloads, p50/p95 of each rerun stage, and a button that profiles the next
+    rerun and offers the report for download.
+    """
+    with st.sidebar.expander("Debug: performance"):
+        cache = get_data_cache(HISTORY_DAYS)
+        lookups = cache.hits + cache.incremental_loads + cache.full_loads
+        hit_rate = f" ({cache.hits / lookups:.0%} hits)" if lookups else ""
+        st.caption(f"load_data: {cache.hits} hits, {cache.incremental_loads} incremental "
+                   f"and {cache.full_loads} full loads{hit_rate}")
+        if snapshot is not None:
+            st.caption(f"Serving from {snapshot.path}, built {snapshot.header['built']}")
+
+        timings = app_timings.summary()
+        if timings:
+            st.dataframe(pd.DataFrame(timings).set_index('stage'))
+        if st.button("Reset timings"):
+            app_timings.clear()
+
+        profiler_kind = st.selectbox("Profiler", PROFILERS)
+        if st.button("Profile next rerun"):
+            st.session_state['profile_next'] = profiler_kind
+            st.rerun()
+        report = st.session_state.get('profile_report')
+        if report:
+            st.download_button(f"Download {report['kind']} report", report['data'],
+                               file_name=report['path'].split('/')[-1], mime=report['mime'])
+            st.caption(f"Saved to {report['path']}")
+            st.code(report['text'], language=None)
+
 # --- Streamlit UI Configuration ---
 st.set_page_config(
     page_title="Local Fuel Price Tracker",
@@ -72,18 +158,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# With FUEL_PROFILE set, each stage of the rerun is timed, and the debug
+# panel can ask for the whole next rerun to be profiled
+rerun_start = time.perf_counter()
+profiler = None
+if PROFILE_ENABLED and 'profile_next' in st.session_state:
+    profiler = RerunProfiler(st.session_state.pop('profile_next'))
+    profiler.start()
+
 st.title("⛽ Local Fuel Price Tracker & Analyzer")
 
-# Load data when the app runs
-df_fuel = load_data()
+# Serve from the daily job's precomputed snapshot while it matches the data;
+# otherwise check for new data and build the per-series index for that version
+with stage('load_data'):
+    snapshot = get_snapshot()
+    if snapshot is None:
+        data_version, fuel_data = load_data()
+with stage('load_index'):
+    fuel_index = snapshot if snapshot is not None else load_index(data_version, fuel_data)
 
-if df_fuel.empty:
+if fuel_index.empty:
     st.warning("No fuel price data available. The daily update script needs to run first or the data file is empty/corrupt.")
     st.info("Please ensure your `fuel_prices.csv` is populated or the GitHub Action has run successfully.")
 else:
-    # Get unique cities and fuel types from the loaded data
-    cities = df_fuel['City'].unique().tolist()
-    fuel_types = df_fuel['FuelType'].unique().tolist()
+    # Unique cities and fuel types are precomputed by the index
+    cities = fuel_index.cities
+    fuel_types = fuel_index.fuel_types
 
     # Sidebar for user selection
     st.sidebar.header("Select Options")
@@ -92,32 +192,51 @@ else:
 
     st.header(f"Current Price in {selected_city} ({selected_fuel_type})")
     
-    # Filter for the latest price of the selected city and fuel type
-    current_price_df = df_fuel[(df_fuel['City'] == selected_city) & (df_fuel['FuelType'] == selected_fuel_type)].tail(1)
+    # Look up the latest price of the selected city and fuel type
+    with stage('latest_price'):
+        latest = fuel_index.latest(selected_city, selected_fuel_type)
     
-    if not current_price_df.empty:
-        latest_price = current_price_df.iloc[0]['Price']
-        latest_date = current_price_df.iloc[0]['Date'].strftime('%Y-%m-%d')
-        st.success(f"### ₹{latest_price:.2f} as of {latest_date}")
+    if latest is not None:
+        latest_price, latest_date = latest
+        st.success(f"### ₹{latest_price:.2f} as of {latest_date.strftime('%Y-%m-%d')}")
     else:
         st.info("No current data available for this city and fuel type combination.")
 
-    st.header("Historical Trend (Last 30 Days)")
-    # Filter data for charting
-    chart_data = df_fuel[(df_fuel['City'] == selected_city) & (df_fuel['FuelType'] == selected_fuel_type)]
+    chart_range = st.sidebar.radio("Chart Range", list(CHART_RANGES))
+    compare_cities = st.sidebar.checkbox("Compare all cities")
+
+    # Aggregated and LTTB-downsampled server-side, so the chart gets a fixed
+    # number of points whatever the range
+    with stage('chart_data'):
+        chart_data = snapshot if snapshot is not None else load_chart_data(data_version, fuel_index)
+        if compare_cities:
+            chart_data_for_plot = chart_data.compare(selected_fuel_type, days=CHART_RANGES[chart_range])
+        else:
+            chart_data_for_plot = chart_data.series(selected_city, selected_fuel_type, days=CHART_RANGES[chart_range])
+    if compare_cities:
+        st.header(f"{selected_fuel_type} Prices Across Cities (Last {chart_range})")
+    else:
+        st.header(f"Historical Trend (Last {chart_range})")
     
-    if not chart_data.empty:
-        # Ensure only relevant columns for the chart and set 'Date' as index
-        chart_data_for_plot = chart_data.set_index('Date')['Price'].tail(30) # Show last 30 days for clarity
-        st.line_chart(chart_data_for_plot)
+    if not chart_data_for_plot.empty:
+        with stage('line_chart'): # Includes serializing the frame for the browser
+            st.line_chart(chart_data_for_plot)
     else:
         st.info("No sufficient historical data for charting.")
 
     st.header("Trend Analysis & Refueling Suggestion")
     # Generate and display the trend analysis
-    summary = analyze_trend(df_fuel, selected_city, selected_fuel_type)
+    with stage('trend_analysis'):
+        trends = snapshot.trends if snapshot is not None else load_trends(data_version, fuel_data)
+        summary = analyze_trend(trends, selected_city, selected_fuel_type)
     st.markdown(summary)
 
 st.markdown("---")
 st.markdown("This app fetches daily fuel prices and provides insights into trends. Data updates daily via GitHub Actions.")
 
+if PROFILE_ENABLED:
+    app_timings.record('rerun', (time.perf_counter() - rerun_start) * 1000)
+    if profiler is not None:
+        st.session_state['profile_report'] = profiler.stop()
+    render_debug_panel(snapshot)
+
@@ -0,0 +1,293 @@
+# backfill.py
+"""
+Bulk historical backfill for the price store.
+
+    python backfill.py archive --start 2021-01-01 --end 2025-07-31 --all-cities --fuels Petrol Diesel
+    python backfill.py files history/*.csv
+
+`archive` recovers past prices from the Internet Archive's snapshots of the
+source pages; `files` ingests bulk CSV files with Date, City, FuelType and
+Price columns. Work is split into units - one (city, fuel type, year) or one
+file - that run in a process pool. Rows are validated with invalid_mask()
+as each batch is written through the storage layer (so identical petrol and
+diesel prices are caught across units of the same batch), and each unit is
+checkpointed once its rows are stored, so an interrupted run picks up where
+it stopped.
+
+By default only dates without a valid row are filled, which repairs gaps
+and bad rows (such as the 103.5/103.5 first row) without refetching the rest.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urlencode
+
+import pandas as pd
+
+import fetch_engine
+from city_registry import CITIES, FUEL_TYPES, get_city
+from fetch_engine import polite_get
+from price_extractor import PRICE_RANGES, extract_price
+from sources import load_sources, source_patterns, source_url
+from storage import COLUMNS, FUEL_STORAGE, get_store
+
+BACKFILL_CHECKPOINT_FILE = '.backfill_checkpoint.json'
+BATCH_SIZE = 5000             # Rows per storage write
+DEFAULT_WORKERS = 4
+
+ARCHIVE_HOST = 'web.archive.org'
+CDX_URL = f'https://{ARCHIVE_HOST}/cdx/search/cdx'
+# id_ serves the page as it was captured, without the archive's toolbar or rewritten links
+SNAPSHOT_URL = f'https://{ARCHIVE_HOST}/web/{{timestamp}}id_/{{url}}'
+ARCHIVE_RATE = 4.0            # Requests per second to the archive, shared by all workers
+
+
+def invalid_mask(df):
+    """
+    Marks rows that cannot be real prices: outside the realistic range for
+    their fuel, or petrol and diesel identical for the same city and day
+    (the signature of a scraper picking up the same number twice).
+    """
+    low = df['FuelType'].map(lambda fuel_type: PRICE_RANGES.get(fuel_type, (None, None))[0]).astype(float)
+    high = df['FuelType'].map(lambda fuel_type: PRICE_RANGES.get(fuel_type, (None, None))[1]).astype(float)
+    out_of_range = ~df['Price'].between(low, high)
+
+    pairs = df[df['FuelType'].isin(['Petrol', 'Diesel'])].pivot_table(
+        index=['Date', 'City'], columns='FuelType', values='Price', aggfunc='last', observed=True)
+    if {'Petrol', 'Diesel'} <= set(pairs.columns):
+        identical = pairs.index[pairs['Petrol'] == pairs['Diesel']]
+        same_pair = pd.MultiIndex.from_frame(df[['Date', 'City']]).isin(identical) & \
+            df['FuelType'].isin(['Petrol', 'Diesel'])
+    else:
+        same_pair = False
+    return out_of_range | same_pair
+
+
+def covered_dates(store):
+    """
+    Returns {(city, fuel_type): set of 'YYYY-MM-DD'} for the dates that
+    already have a valid row in the store.
+    """
+    df = store.load()
+    if df.empty:
+        return {}
+    df = df.astype({'City': str, 'FuelType': str})
+    df = df[~invalid_mask(df)]
+    dates = df['Date'].dt.strftime('%Y-%m-%d')
+    return {key: set(group) for key, group in dates.groupby([df['City'], df['FuelType']])}
+
+
+# --- Work units (run in the worker processes) ---
+
+def init_worker(workers):
+    """
+    Splits the archive's request budget between the worker processes, each of
+    which has its own host limiters.
+    """
+    fetch_engine.HOST_LIMITS[ARCHIVE_HOST] = (1, ARCHIVE_RATE / workers, 1)
+
+
+def snapshots(url, start, end):
+    """
+    Lists the archive's captures of `url` between two dates, at most one per
+    day, as (timestamp, original_url) pairs.
+    """
+    params = {
+        'url': url,
+        'from': start.replace('-', ''),
+        'to': end.replace('-', ''),
+        'output': 'json',
+        'filter': 'statuscode:200',
+        'collapse': 'timestamp:8',
+        'fl': 'timestamp,original',
+    }
+    rows = polite_get(f'{CDX_URL}?{urlencode(params)}', use_cache=False).json()
+    return [(timestamp, original) for timestamp, original in rows[1:]]  # First row is the header
+
+
+def backfill_archive(city_name, fuel_type, start, end, skip_dates):
+    """
+    Recovers one city's prices for one fuel type between two dates from
+    archived source pages. Sources are tried in preference order; a later
+    source only fills the dates the earlier ones didn't. Dates in `skip_dates`
+    are left alone. Returns the rows found.
+    """
+    city = get_city(city_name)
+    found = {}
+    for spec in load_sources():
+        if fuel_type not in spec.fuel_types:
+            continue
+        patterns = source_patterns(spec, city, fuel_type)
+        price_range = (spec.price_ranges or {}).get(fuel_type)
+        for timestamp, original in snapshots(source_url(spec, city, fuel_type), start, end):
+            date = f'{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}'
+            if date in found or date in skip_dates:
+                continue
+            try:
+                # Captures never change, and thousands of them would only crowd the HTTP cache
+                response = polite_get(SNAPSHOT_URL.format(timestamp=timestamp, url=original), use_cache=False)
+            except Exception as e:
+                print(f"WARNING: {spec.name} snapshot {timestamp} for {city_name} {fuel_type}: {e}")
+                continue
+            price = extract_price(response.text, patterns, fuel_type, xpaths=spec.xpaths, price_range=price_range)
+            if price is not None:
+                found[date] = price
+    return [{'Date': date, 'City': city_name, 'FuelType': fuel_type, 'Price': price}
+            for date, price in sorted(found.items())]
+
+
+def backfill_file(path, skip_dates):
+    """
+    Reads one bulk CSV file and returns its valid rows, minus those whose
+    (city, fuel type) already has a valid row on that date.
+    """
+    df = pd.read_csv(path, usecols=COLUMNS)
+    df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+    df = df.dropna()
+    df = df[~invalid_mask(df)]
+    keep = [date not in skip_dates.get((city, fuel_type), ())
+            for date, city, fuel_type in zip(df['Date'], df['City'], df['FuelType'])]
+    return df[keep].to_dict('records')
+
+
+# --- Driver ---
+
+class Checkpoint:
+    """
+    Ids of the work units whose rows are already in the store, persisted
+    after every batch write, plus the archive run's resolved end date: unit
+    ids include their date range, so a resumed run must split the work the
+    same way even on a later day.
+    """
+
+    def __init__(self, path=BACKFILL_CHECKPOINT_FILE):
+        self.path = path
+        self.done = set()
+        self.end = None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.done = set(data['done'])
+            self.end = data.get('end')
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': sorted(self.done), 'end': self.end}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def archive_units(city_names, fuel_types, start, end, covered):
+    """
+    Splits an archive backfill into one unit per (city, fuel type, year).
+    """
+    units = []
+    for year in range(int(start[:4]), int(end[:4]) + 1):
+        year_start, year_end = max(start, f'{year}-01-01'), min(end, f'{year}-12-31')
+        for city_name in city_names:
+            for fuel_type in fuel_types:
+                skip = {date for date in covered.get((city_name, fuel_type), ())
+                        if year_start <= date <= year_end}
+                units.append((f'archive:{city_name}:{fuel_type}:{year_start}:{year_end}', backfill_archive,
+                              (city_name, fuel_type, year_start, year_end, skip)))
+    return units
+
+
+def file_units(paths, covered):
+    return [(f'file:{os.path.abspath(path)}', backfill_file, (path, covered)) for path in paths]
+
+
+def run_backfill(units, store, checkpoint, workers=DEFAULT_WORKERS):
+    """
+    Runs the work units not yet in the checkpoint in a process pool and writes
+    their valid rows in batches of about BATCH_SIZE. A unit is checkpointed only once
+    the batch holding its rows is stored; re-running a unit whose batch was
+    lost is harmless because writes are upserts.
+    """
+    pending = [unit for unit in units if unit[0] not in checkpoint.done]
+    print(f"Backfill: {len(pending)} of {len(units)} units to run ({len(units) - len(pending)} already done)")
+    if not pending:
+        return 0
+
+    batch, batch_units, written, failed, dropped = [], [], 0, 0, 0
+
+    def flush():
+        nonlocal written, dropped
+        if batch:
+            df = pd.DataFrame(batch, columns=COLUMNS)
+            invalid = invalid_mask(df)
+            dropped += int(invalid.sum())
+            written += store.upsert(df[~invalid].to_dict('records'))
+        checkpoint.done.update(batch_units)
+        checkpoint.save()
+        batch.clear()
+        batch_units.clear()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(workers,)) as pool:
+        futures = {pool.submit(func, *args): unit_id for unit_id, func, args in pending}
+        for future in as_completed(futures):
+            unit_id = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"ERROR: {unit_id} failed, will be retried on the next run: {e}")
+                continue
+            print(f"{unit_id}: {len(rows)} rows")
+            batch.extend(rows)
+            batch_units.append(unit_id)
+            if len(batch) >= BATCH_SIZE:
+                flush()
+    flush()
+    print(f"Backfill wrote {written} rows to {store.path}" + (f", dropped {dropped} invalid rows" if dropped else "")
+          + (f"; {failed} units failed" if failed else ""))
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill historical fuel prices into the price store.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    archive = subparsers.add_parser('archive', help="Recover prices from archived copies of the source pages")
+    archive.add_argument('--start', required=True, help="First date, YYYY-MM-DD")
+    archive.add_argument('--end', help="Last date (default: the end of the run being resumed, else today)")
+    archive.add_argument('--cities', nargs='+', metavar='CITY', help="Cities to backfill (default: New Delhi)")
+    archive.add_argument('--all-cities', action='store_true', help="Backfill every city in city_registry.CITIES")
+    archive.add_argument('--fuels', nargs='+', choices=FUEL_TYPES, metavar='FUEL', default=['Petrol', 'Diesel'],
+                         help=f"Fuel types to backfill, from {FUEL_TYPES} (default: Petrol Diesel)")
+
+    files = subparsers.add_parser('files', help="Ingest bulk CSV files with Date, City, FuelType and Price columns")
+    files.add_argument('paths', nargs='+', metavar='CSV')
+
+    for subparser in (archive, files):
+        subparser.add_argument('--storage', choices=['csv', 'sqlite', 'parquet'], default=FUEL_STORAGE,
+                               help="Storage backend (default: the FUEL_STORAGE environment variable, else csv)")
+        subparser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Worker processes")
+        subparser.add_argument('--checkpoint', default=BACKFILL_CHECKPOINT_FILE,
+                               help="Progress file; delete it to start over")
+        subparser.add_argument('--overwrite', action='store_true',
+                               help="Also replace dates that already have a valid row")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = get_store(args.storage)
+    checkpoint = Checkpoint(args.checkpoint)
+    covered = {} if args.overwrite else covered_dates(store)
+    if args.command == 'archive':
+        checkpoint.end = args.end or checkpoint.end or datetime.now().strftime('%Y-%m-%d')
+        city_names = [city.name for city in CITIES] if args.all_cities else (args.cities or ['New Delhi'])
+        units = archive_units([get_city(name).name for name in city_names], args.fuels, args.start,
+                              checkpoint.end, covered)
+    else:
+        units = file_units(args.paths, covered)
+    run_backfill(units, store, checkpoint, args.workers)
+
+
+if __name__ == '__main__':
+    main()
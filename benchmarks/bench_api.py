@@ -0,0 +1,88 @@
+# benchmarks/bench_api.py
+"""
+Measures requests per second of the JSON API (api.py), calling the ASGI
+application in-process so the number is the app's own cost, without a
+server or network in between.
+
+Run from the repository root:
+    python benchmarks/bench_api.py [--requests N] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api import PriceApi  # noqa: E402
+
+REQUESTS = [
+    ('/latest', ''),
+    ('/latest', 'city=New+Delhi&fuel=Petrol'),
+    ('/trend', 'city=New+Delhi&fuel=Diesel'),
+    ('/history', 'city=New+Delhi&fuel=Petrol&days=365'),
+]
+
+
+async def call(app, path, query, headers=()):
+    """
+    Runs one GET through the ASGI app and returns (status, headers, body).
+    """
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+             'headers': list(headers)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start, body = messages
+    return start['status'], dict(start['headers']), body['body']
+
+
+async def bench(app, path, query, count, revalidate=False):
+    headers = ()
+    if revalidate:
+        _, response_headers, _ = await call(app, path, query)
+        headers = [(b'if-none-match', response_headers[b'etag'])]
+    start = time.perf_counter()
+    for _ in range(count):
+        status, _, _ = await call(app, path, query, headers)
+    elapsed = time.perf_counter() - start
+    return {'status': status, 'requests_per_second': round(count / elapsed)}
+
+
+async def run(count):
+    app = PriceApi()
+    results = {}
+    for path, query in REQUESTS:
+        name = f'{path}?{query}' if query else path
+        results[name] = await bench(app, path, query, count)
+        results[name + ' (If-None-Match)'] = await bench(app, path, query, count, revalidate=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000, help="Requests per measurement")
+    parser.add_argument('--output', help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests))
+    print(f"{'request':<64}{'status':>8}{'req/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<64}{result['status']:>8}{result['requests_per_second']:>12,}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
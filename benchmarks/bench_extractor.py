@@ -0,0 +1,143 @@
+# benchmarks/bench_extractor.py
+"""
+Compares the old per-scraper extraction (BeautifulSoup html.parser tree,
+get_text() of the whole page, uncompiled re.findall per pattern) with
+price_extractor against the HTML fixtures.
+
+The fixtures are synthetic: generated filler markup around price sentences
+written to match the scraper patterns, not captures of the live sites. The
+timings compare the two extraction paths on pages of a realistic size; they
+say nothing about how either copes with the real markup.
+
+Run from the repository root:
+    python benchmarks/bench_extractor.py [--repeat N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import fetch_fuel_data  # noqa: E402
+from city_registry import get_city  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+
+# The patterns and ranges the scrapers used before price_extractor existed
+LEGACY_PATTERNS = {
+    ('cardekho', 'Petrol'): [
+        r'Today.{0,20}s Petrol price in Delhi stands at ₹\s*(\d+\.?\d*)\s*per litre',
+        r'Petrol price in Delhi stands at ₹\s*(\d+\.?\d*)',
+        r'₹\s*(\d+\.?\d*)\s*per litre.*petrol',
+    ],
+    ('cardekho', 'Diesel'): [
+        r'Diesel price in Delhi stands at ₹\s*(\d+\.?\d*)\s*per litre',
+        r'average Diesel price in Delhi stands at ₹\s*(\d+\.?\d*)',
+        r'₹\s*(\d+\.?\d*)\s*per litre.*diesel',
+    ],
+    ('goodreturns', 'Petrol'): [
+        r'Rs\.\s*(\d+\.?\d*)/Ltr',
+        r'₹\s*(\d+\.?\d*)\s*per\s*litre',
+        r'Today.*Delhi.*₹\s*(\d+\.?\d*)',
+        r'New Delhi Petrol Price.*Rs\.\s*(\d+\.?\d*)',
+    ],
+    ('goodreturns', 'Diesel'): [
+        r'Rs\.\s*(\d+\.?\d*)/Ltr',
+        r'₹\s*(\d+\.?\d*)\s*per\s*litre',
+        r'Today.*Delhi.*₹\s*(\d+\.?\d*)',
+        r'New Delhi Diesel Price.*Rs\.\s*(\d+\.?\d*)',
+    ],
+    ('acko', 'Petrol'): [
+        r'(\d+\.?\d*),/\s*per\s*litre',
+        r'₹\s*(\d+\.?\d*)\s*per\s*litre',
+        r'Today.*(\d+\.?\d*)\s*per\s*litre',
+        r'Petrol Price.*(\d+\.?\d*)',
+    ],
+    ('acko', 'Diesel'): [
+        r'(\d+\.?\d*),/\s*per\s*litre',
+        r'₹\s*(\d+\.?\d*)\s*per\s*litre',
+        r'Today.*(\d+\.?\d*)\s*per\s*litre',
+        r'Diesel Price.*(\d+\.?\d*)',
+    ],
+    ('businesstoday', 'Petrol'): [
+        r'₹(\d+\.?\d*)\s*per\s*litre',
+        r'stood at ₹(\d+\.?\d*)',
+        r'price.*Delhi.*₹(\d+\.?\d*)',
+    ],
+}
+LEGACY_RANGES = {'Petrol': (85, 105), 'Diesel': (80, 95)}
+
+
+def legacy_extract(html, source_name, fuel_type):
+    """
+    The extraction loop as it was copy-pasted in every scraper.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    page_text = soup.get_text()
+    low, high = LEGACY_RANGES[fuel_type]
+    for pattern in LEGACY_PATTERNS[(source_name, fuel_type)]:
+        for match in re.findall(pattern, page_text, re.IGNORECASE):
+            if low <= float(match) <= high:
+                return float(match)
+    return None
+
+
+def current_extract(html, source_name, fuel_type):
+    """
+    Runs the real scraper with the network call replaced by the fixture.
+    """
+    response = mock.Mock(text=html)
+    spec = next(spec for spec in fetch_fuel_data.SOURCES if spec.name == source_name)
+    with mock.patch.object(fetch_fuel_data, 'polite_get', return_value=response), \
+            mock.patch('builtins.print'):
+        return fetch_fuel_data.scrape(spec, get_city('New Delhi'), fuel_type)
+
+
+def load_fixtures():
+    fixtures = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if filename.endswith('.html'):
+            source_name, fuel = filename[:-len('.html')].split('_')
+            with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as f:
+                fixtures.append((source_name, fuel.capitalize(), f.read()))
+    return fixtures
+
+
+def time_call(func, repeat, *args):
+    """
+    Returns (best time in ms, result) over `repeat` calls.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per fixture (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<24}{'size KB':>9}{'legacy ms':>12}{'current ms':>12}{'speedup':>9}  prices")
+    total_legacy = total_current = 0.0
+    for source_name, fuel_type, html in load_fixtures():
+        legacy_ms, legacy_price = time_call(legacy_extract, args.repeat, html, source_name, fuel_type)
+        current_ms, current_price = time_call(current_extract, args.repeat, html, source_name, fuel_type)
+        total_legacy += legacy_ms
+        total_current += current_ms
+        print(f"{source_name + '/' + fuel_type:<24}{len(html) / 1024:>9.0f}{legacy_ms:>12.2f}{current_ms:>12.2f}"
+              f"{legacy_ms / current_ms:>8.1f}x  {legacy_price} -> {current_price}")
+    print(f"{'total':<24}{'':>9}{total_legacy:>12.2f}{total_current:>12.2f}{total_legacy / total_current:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# benchmarks/bench_scrapers.py
+"""
+Benchmarks the scrapers against the local mock server: per-source fetch,
+parse and regex time, and end-to-end fetch_and_save_data() time.
+
+Run from the repository root:
+    python benchmarks/bench_scrapers.py [--repeat N] [--latency S] [--failure-rate P] [--output FILE]
+
+Results are printed as a table and, with --output, written as JSON so they can
+be compared across releases.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fetch_engine  # noqa: E402
+import fetch_fuel_data  # noqa: E402
+import price_extractor  # noqa: E402
+from city_registry import get_city  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from mock_server import MockSiteServer, LocalRedirectAdapter  # noqa: E402
+
+
+def summarize(samples):
+    """
+    Reduces a list of seconds to millisecond stats.
+    """
+    if not samples:
+        return None
+    ms = sorted(sample * 1000 for sample in samples)
+    return {
+        'min': round(ms[0], 3),
+        'median': round(statistics.median(ms), 3),
+        'max': round(ms[-1], 3),
+        'runs': len(ms),
+    }
+
+
+def point_at_server(server, cache_dir):
+    """
+    Routes fetch_engine's shared session to the mock server and gives it a
+    fresh cache and fresh host limiters.
+    """
+    session = fetch_engine.get_session()
+    adapter = LocalRedirectAdapter(server.port, pool_connections=fetch_engine.POOL_CONNECTIONS,
+                                   pool_maxsize=fetch_engine.POOL_MAXSIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    fetch_engine._cache = HttpCache(cache_dir)
+    fetch_engine._limiters.clear()
+
+
+def bench_sources(repeat):
+    """
+    Times fetch, parse and regex separately for every source page of New Delhi.
+    """
+    timings = {}
+    current = {}
+
+    def timed_get(url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fetch_engine.polite_get(url, *args, **kwargs)
+        finally:
+            current['fetch'] = time.perf_counter() - start
+
+    def timed_extract(html, patterns, fuel_type, xpaths=None, price_range=None):
+        start = time.perf_counter()
+        text = price_extractor.page_text(html, xpaths)
+        current['parse'] = time.perf_counter() - start
+        start = time.perf_counter()
+        price = price_extractor.find_price(text, patterns, fuel_type, price_range)
+        current['regex'] = time.perf_counter() - start
+        return price
+
+    city = get_city('New Delhi')
+    with mock.patch.object(fetch_fuel_data, 'polite_get', timed_get), \
+            mock.patch.object(fetch_fuel_data, 'extract_price', timed_extract):
+        for spec in fetch_fuel_data.SOURCES:
+            for fuel_type in ('Petrol', 'Diesel'):
+                if fuel_type not in spec.fuel_types:
+                    continue
+                samples = {'fetch': [], 'parse': [], 'regex': [], 'total': []}
+                price = error = None
+                for _ in range(repeat):
+                    current.clear()
+                    fetch_engine._limiters.clear()  # Measure the request, not the politeness wait
+                    start = time.perf_counter()
+                    try:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            price = fetch_fuel_data.scrape(spec, city, fuel_type)
+                    except Exception as e:
+                        error = str(e)
+                    samples['total'].append(time.perf_counter() - start)
+                    for stage in ('fetch', 'parse', 'regex'):
+                        if stage in current:
+                            samples[stage].append(current[stage])
+                timings[f'{spec.name}/{fuel_type}'] = {
+                    **{f'{stage}_ms': summarize(values) for stage, values in samples.items()},
+                    'price': price,
+                    'error': error,
+                }
+    return timings
+
+
+def join_worker_threads():
+    """
+    Waits for scraper tasks that gather_prices() abandoned once it had its
+    prices, so they neither print into the next measurement nor outlive the server.
+    """
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and not thread.daemon:
+            thread.join()
+
+
+def bench_end_to_end(repeat, work_dir):
+    """
+    Times complete fetch_and_save_data() runs, writing to a scratch CSV.
+    """
+    samples = []
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        for _ in range(repeat):
+            fetch_engine._limiters.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fetch_fuel_data.fetch_and_save_data(storage_backend='csv')
+                samples.append(time.perf_counter() - start)
+                join_worker_threads()
+    finally:
+        os.chdir(previous_dir)
+    return summarize(samples)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    print(f"{'source/fuel':<24}{'fetch ms':>10}{'parse ms':>10}{'regex ms':>10}{'total ms':>10}  price")
+    for name, result in report['sources'].items():
+        cells = [(result[f'{stage}_ms'] or {}).get('median') for stage in ('fetch', 'parse', 'regex', 'total')]
+        print(f"{name:<24}" + ''.join(f"{c:>10.2f}" if c is not None else f"{'-':>10}" for c in cells)
+              + f"  {result['price'] if result['error'] is None else 'ERROR: ' + result['error']}")
+    e2e = report['end_to_end_ms']
+    print(f"\nfetch_and_save_data: median {e2e['median']:.1f} ms (min {e2e['min']:.1f}, max {e2e['max']:.1f}, "
+          f"{e2e['runs']} runs, {report['server_requests']} mock requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds of simulated server latency")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    with MockSiteServer(latency=args.latency, failure_rate=args.failure_rate) as server, \
+            tempfile.TemporaryDirectory() as work_dir:
+        point_at_server(server, os.path.join(work_dir, 'http_cache'))
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'lxml': price_extractor.HAVE_LXML,
+            },
+            'config': vars(args),
+            'sources': bench_sources(args.repeat),
+            'end_to_end_ms': bench_end_to_end(args.repeat, work_dir),
+            'server_requests': server.requests,
+        }
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
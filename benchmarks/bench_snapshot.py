@@ -0,0 +1,106 @@
+# benchmarks/bench_snapshot.py
+"""
+Compares the dashboard's cold start with and without the daily snapshot
+(snapshot.py) on a synthetic history: loading and indexing the price file
+then building chart data and trends, versus opening the snapshot and reading
+the first view from it.
+
+Run from the repository root:
+    python benchmarks/bench_snapshot.py [--cities N] [--years N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chart_data import CHART_RANGES, HISTORY_DAYS, ChartData  # noqa: E402
+from data_cache import DataCache  # noqa: E402
+from series_index import SeriesIndex  # noqa: E402
+from snapshot import data_fingerprint, open_snapshot, write_snapshot  # noqa: E402
+from storage import CsvStore  # noqa: E402
+from trends import TREND_DAYS, compute_trends  # noqa: E402
+
+FUEL_TYPES = ['Petrol', 'Diesel', 'CNG', 'LPG']
+
+
+def write_history(path, cities, years):
+    """
+    Writes a daily random-walk price history for `cities` x FUEL_TYPES.
+    """
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=years * 365, freq='D')
+    rng = np.random.default_rng(0)
+    frames = []
+    for city in range(cities):
+        for fuel_type in FUEL_TYPES:
+            prices = 90 + np.cumsum(rng.normal(0, 0.1, len(dates)))
+            frames.append(pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'), 'City': f'City {city}',
+                                        'FuelType': fuel_type, 'Price': prices.round(2)}))
+    pd.concat(frames).sort_values('Date', kind='stable').to_csv(path, index=False)
+
+
+def cold_start_live(store):
+    _, df = DataCache(store, HISTORY_DAYS).refresh()
+    index = SeriesIndex(df)
+    key = index.keys()[0]
+    index.latest(*key)
+    ChartData(index).series(*key, days=CHART_RANGES['30 days'])
+    compute_trends(df, days=TREND_DAYS)
+
+
+def cold_start_snapshot(store, path):
+    snapshot = open_snapshot(data_fingerprint(store), path)
+    key = snapshot.keys()[0]
+    snapshot.latest(*key)
+    snapshot.series(*key, days=CHART_RANGES['30 days'])
+    snapshot.trends
+
+
+def timed(func, *args, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(min(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cities', type=int, default=50, help="Cities in the synthetic history")
+    parser.add_argument('--years', type=int, default=5, help="Years of daily prices per series")
+    parser.add_argument('--output', help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CsvStore(os.path.join(tmp, 'fuel_prices.csv'))
+        write_history(store.path, args.cities, args.years)
+        snapshot_path = os.path.join(tmp, 'fuel_snapshot.bin')
+        start = time.perf_counter()
+        write_snapshot(store, snapshot_path)
+        results = {
+            'series': args.cities * len(FUEL_TYPES),
+            'csv_bytes': os.path.getsize(store.path),
+            'snapshot_bytes': os.path.getsize(snapshot_path),
+            'snapshot_build_ms': round((time.perf_counter() - start) * 1000, 2),
+            'cold_start_live_ms': timed(cold_start_live, store),
+            'cold_start_snapshot_ms': timed(cold_start_snapshot, store, snapshot_path),
+        }
+
+    for name, value in results.items():
+        print(f"{name:<24}{value:>14,}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
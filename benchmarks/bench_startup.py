@@ -0,0 +1,105 @@
+# benchmarks/bench_startup.py
+"""
+Measures cold-start cost of the daily fetch job: wall time of importing
+fetch_fuel_data and of `fetch_fuel_data.py --help` in a fresh interpreter,
+the slowest imports (from python -X importtime), and which heavy modules
+got loaded.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--repeat N] [--check] [--output FILE]
+
+With --check the exit status is 1 if the fetch path imports any of
+HEAVY_MODULES, so a stray top-level import fails CI instead of slowly
+creeping back into every run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the fetch job must not import at startup
+HEAVY_MODULES = ['pandas', 'numpy', 'bs4', 'lxml', 'selenium', 'streamlit', 'pyarrow']
+
+LOADED_SCRIPT = (
+    "import sys, json, fetch_fuel_data; "
+    f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+)
+
+
+def run(args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def time_command(args, repeat):
+    """
+    Returns millisecond stats for running `python <args>` in a fresh process.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(args)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {'min': round(samples[0], 1), 'median': round(statistics.median(samples), 1),
+            'max': round(samples[-1], 1), 'runs': repeat}
+
+
+def slowest_imports(count=10):
+    """
+    Returns the direct imports of the top-level modules (fetch_fuel_data and
+    the interpreter's own startup) with the largest cumulative import time,
+    in milliseconds.
+    """
+    stderr = run(['-X', 'importtime', '-c', 'import fetch_fuel_data']).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # One indent level below the top: what the top-level modules import directly
+        if name.startswith('  ') and not name.startswith('    '):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    imports.sort(key=lambda item: -item[1])
+    return [{'module': name, 'cumulative_ms': round(ms, 1)} for name, ms in imports[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement")
+    parser.add_argument('--check', action='store_true', help="Exit with status 1 if a heavy module is imported")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        'python_startup_ms': time_command(['-c', 'pass'], args.repeat),
+        'import_ms': time_command(['-c', 'import fetch_fuel_data'], args.repeat),
+        'cli_help_ms': time_command(['fetch_fuel_data.py', '--help'], args.repeat),
+        'slowest_imports': slowest_imports(),
+        'heavy_modules_loaded': json.loads(run(['-c', LOADED_SCRIPT]).stdout),
+    }
+
+    for name in ('python_startup_ms', 'import_ms', 'cli_help_ms'):
+        stats = report[name]
+        print(f"{name:<20} median {stats['median']:>7.1f} ms (min {stats['min']:.1f}, max {stats['max']:.1f})")
+    print("\nSlowest imports (cumulative):")
+    for item in report['slowest_imports']:
+        print(f"  {item['module']:<30}{item['cumulative_ms']:>8.1f} ms")
+    loaded = report['heavy_modules_loaded']
+    print(f"\nHeavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.check and loaded:
+        print(f"ERROR: the fetch job imports {', '.join(loaded)} at startup")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/mock_server.py
+"""
+Local stand-in for the price sites, serving the synthetic pages in
+benchmarks/fixtures/ (generated filler around price sentences that match
+the scraper patterns, not captures of the live sites) with configurable
+latency and failure rate.
+
+Scraper URLs keep pointing at the real hosts; LocalRedirectAdapter rewrites
+them onto the local server at the transport layer, so the real fetch_engine
+code path (host limits, retries, cache) is exercised unchanged.
+"""
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SOURCES = ['cardekho', 'goodreturns', 'acko', 'businesstoday']
+FUELS = ['petrol', 'diesel', 'cng', 'lpg']
+
+
+def fixture_for(path):
+    """
+    Maps a rewritten request path (/<host>/<original path>) to a fixture file, or None.
+    """
+    host, _, rest = path.lstrip('/').partition('/')
+    source = next((name for name in SOURCES if name in host), None)
+    fuel = next((name for name in FUELS if name in rest), None)
+    if source is None or fuel is None:
+        return None
+    filename = os.path.join(FIXTURES_DIR, f'{source}_{fuel}.html')
+    return filename if os.path.exists(filename) else None
+
+
+class MockSiteServer:
+    """
+    Threaded HTTP server for the fixture pages.
+
+    latency      - seconds added before every response, or a dict of source -> seconds
+    failure_rate - probability of answering 503 instead of the page
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def latency_for(self, path):
+        if isinstance(self.latency, dict):
+            host = path.lstrip('/').partition('/')[0]
+            return next((delay for name, delay in self.latency.items() if name in host), 0.0)
+        return self.latency
+
+    def page(self, filename):
+        if filename not in self._pages:
+            with open(filename, 'rb') as f:
+                self._pages[filename] = f.read()
+        return self._pages[filename]
+
+    def handle(self, handler):
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.failure_rate
+        time.sleep(self.latency_for(handler.path))
+
+        filename = fixture_for(handler.path)
+        if fail or filename is None:
+            handler.send_response(503 if fail else 404)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        body = self.page(filename)
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+
+class LocalRedirectAdapter(HTTPAdapter):
+    """
+    Transport adapter that sends every request to the mock server, keeping the
+    original host as the first path segment.
+    """
+
+    def __init__(self, port, **kwargs):
+        self.port = port
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f'http://127.0.0.1:{self.port}/{parts.netloc}{parts.path}'
+        return super().send(request, **kwargs)
@@ -0,0 +1,180 @@
+# browser_pool.py
+import os
+import threading
+import time
+
+from fetch_engine import DEFAULT_HEADERS, limiter_for
+from price_extractor import compile_pattern
+
+# Headless browsers kept warm for a batch; also the cap on concurrent renders
+BROWSER_POOL_SIZE = int(os.environ.get('FUEL_BROWSER_POOL_SIZE', '2'))
+RENDER_TIMEOUT = 20           # Seconds for a page load, for its price to appear, and to wait for a free browser
+RENDER_POLL = 0.25            # Seconds between checks for the price while a page renders
+
+# Requests the browser never makes: the price is text, so images and fonts are wasted time
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+                '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+
+
+class BrowserPool:
+    """
+    A small pool of headless Chrome instances for pages that only show their
+    price after client-side rendering.
+
+    Browsers are launched on demand, up to `size`, and reused for every page
+    of the batch, so rendering costs a page load rather than a browser start.
+    At most `size` pages render at once; further callers wait for a free
+    browser, or launch a replacement when one dies, for up to RENDER_TIMEOUT
+    seconds. Each render also holds the host's politeness slot from
+    fetch_engine. Requires selenium (requirements-browser.txt), which is only
+    imported when the first browser starts.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE):
+        self.size = size
+        self._idle = []  # Most recently used last: its caches are warmest
+        self._drivers = []
+        self._starting = 0
+        self._available = threading.Condition()
+
+    def _launch(self):
+        from selenium import webdriver
+
+        options = webdriver.ChromeOptions()
+        for argument in ('--headless=new', '--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage',
+                         '--disable-extensions', f"--user-agent={DEFAULT_HEADERS['User-Agent']}"):
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(RENDER_TIMEOUT)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        return driver
+
+    def _acquire(self):
+        deadline = time.monotonic() + RENDER_TIMEOUT
+        with self._available:
+            while not self._idle and len(self._drivers) + self._starting >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser became free within {RENDER_TIMEOUT}s")
+                self._available.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._starting += 1  # Hold the slot while the browser starts
+        try:
+            driver = self._launch()
+        except Exception:
+            with self._available:
+                self._starting -= 1
+                self._available.notify()  # A waiter can try a launch of its own
+            raise
+        with self._available:
+            self._starting -= 1
+            self._drivers.append(driver)
+        return driver
+
+    def _release(self, driver):
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    @staticmethod
+    def _alive(driver):
+        """
+        Whether the browser session still answers after a failed render.
+        A page that timed out or lacks its price leaves it usable; a crashed
+        browser or an invalid session does not.
+        """
+        try:
+            driver.title
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, driver):
+        """
+        Drops a browser whose session died mid-render; a waiting caller, or
+        the next one, launches a fresh one in its place.
+        """
+        with self._available:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _price_shown(driver, xpaths, patterns):
+        """
+        Whether the page shows its price yet: one of the `xpaths` containers
+        is in the DOM, or one of the price `patterns` matches the visible text.
+        """
+        if any(driver.find_elements('xpath', xpath) for xpath in xpaths):
+            return True
+        if patterns:
+            text = driver.execute_script("return document.body ? document.body.innerText : ''") or ''
+            return any(compile_pattern(pattern).search(text) for pattern in patterns)
+        return False
+
+    def render(self, url, xpaths=(), patterns=()):
+        """
+        Loads `url` in a pooled browser and returns the rendered HTML, once
+        one of the `xpaths` price containers is in the DOM or one of the price
+        `patterns` matches the page text. If neither shows up within
+        RENDER_TIMEOUT the page is returned as it is, and the extractor finds
+        no price in it.
+        """
+        driver = self._acquire()
+        try:
+            with limiter_for(url):
+                driver.get(url)
+                if xpaths or patterns:
+                    deadline = time.monotonic() + RENDER_TIMEOUT
+                    while not self._price_shown(driver, xpaths, patterns) and time.monotonic() < deadline:
+                        time.sleep(RENDER_POLL)
+                html = driver.page_source
+        except Exception:
+            if self._alive(driver):
+                self._release(driver)
+            else:
+                self._discard(driver)
+            raise
+        self._release(driver)
+        return html
+
+    def close(self):
+        with self._available:
+            drivers = self._drivers
+            self._drivers, self._idle = [], []
+            self._available.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Returns the process-wide BrowserPool, creating it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
+
+
+def close_browser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,122 @@
+# chart_data.py
+import numpy as np
+import pandas as pd
+
+# Chart ranges offered by the dashboard (and prebuilt in the snapshot), in calendar days
+CHART_RANGES = {'30 days': 30, '1 year': 365, '5 years': 5 * 365}
+# The longest chart range is all the history the dashboard and API need; with
+# the Parquet store this means only the monthly partitions in it are read
+HISTORY_DAYS = max(CHART_RANGES.values())
+
+# Most points sent to the browser per line, whatever the history length
+POINT_BUDGET = 200
+# Finest resolution whose point count in the requested range is at most this
+# is downsampled with LTTB; longer ranges start from a coarser aggregate
+LTTB_INPUT_LIMIT = 2000
+
+# Aggregates precomputed per series: resolution -> resample() arguments (None = as stored).
+# Buckets are labelled with their first day so the last point never lies in the future
+RESOLUTIONS = {
+    'daily': None,
+    'weekly': {'rule': 'W-MON', 'label': 'left', 'closed': 'left'},
+    'monthly': {'rule': 'MS'},
+}
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-triangle-three-buckets downsampling. Returns the indices of the
+    `threshold` points of (x, y) that best preserve the line's visual shape:
+    the first and last point, plus from each of the equal buckets in between
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. `x` must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(prices, points=POINT_BUDGET):
+    """
+    Reduces a date-indexed price Series to at most `points` points with LTTB.
+    """
+    if len(prices) <= points:
+        return prices
+    # Days since the epoch keep the triangle areas well scaled
+    x = prices.index.values.astype('datetime64[s]').astype(np.float64) / 86400
+    return prices.iloc[lttb(x, prices.to_numpy(dtype=np.float64), points)]
+
+
+class ChartData:
+    """
+    Daily, weekly and monthly aggregates of every series in a SeriesIndex,
+    served downsampled to a fixed point budget.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._aggregates = {}
+        for key in index.keys():
+            daily = index.series(*key)
+            for resolution, resample_args in RESOLUTIONS.items():
+                self._aggregates[key + (resolution,)] = (
+                    daily if resample_args is None else daily.resample(**resample_args).mean().dropna()
+                )
+
+    def aggregate(self, city, fuel_type, resolution='daily', days=None):
+        """
+        Returns the precomputed aggregate for one series, limited to the last
+        `days` calendar days of its history if given, or an empty Series.
+        """
+        prices = self._aggregates.get((city, fuel_type, resolution))
+        if prices is None:
+            return pd.Series(dtype='float64', name='Price')
+        if days is not None and not prices.empty:
+            latest = self.index.latest(city, fuel_type)[1]
+            prices = prices.loc[latest - pd.Timedelta(days=days):]
+        return prices
+
+    def series(self, city, fuel_type, days=None, points=POINT_BUDGET):
+        """
+        Returns at most `points` points of one series over the last `days`
+        calendar days (the whole history by default), for st.line_chart.
+        """
+        for resolution in RESOLUTIONS:
+            prices = self.aggregate(city, fuel_type, resolution, days)
+            if len(prices) <= LTTB_INPUT_LIMIT:
+                break
+        return downsample(prices, points)
+
+    def compare(self, fuel_type, days=None, points=POINT_BUDGET):
+        """
+        Returns a Date x City frame of one fuel type across every city, for a
+        comparison chart. All cities use the same resolution - the finest one
+        that fits the point budget - so their points line up; only when even
+        monthly points exceed the budget is each line downsampled on its own.
+        """
+        keys = set(self.index.keys())
+        cities = [city for city in self.index.cities if (city, fuel_type) in keys]
+        if not cities:
+            return pd.DataFrame()
+        for resolution in RESOLUTIONS:
+            lines = {city: self.aggregate(city, fuel_type, resolution, days) for city in cities}
+            if max(len(prices) for prices in lines.values()) <= points:
+                break
+        else:
+            lines = {city: downsample(prices, points) for city, prices in lines.items()}
+        return pd.DataFrame(lines)
@@ -0,0 +1,65 @@
+# city_registry.py
+from collections import namedtuple
+
+# Fuel types we track, in the order they are fetched and displayed
+FUEL_TYPES = ['Petrol', 'Diesel', 'CNG', 'LPG']
+
+# A tracked city:
+#   name  - city name as stored in fuel_prices.csv
+#   match - how the price pages refer to the city in their text
+#   slugs - per-source URL slugs, only where a source differs from the default slug
+City = namedtuple('City', ['name', 'match', 'slugs'])
+
+CITIES = [
+    City('New Delhi', 'Delhi', {'cardekho': 'delhi-state', 'businesstoday': 'delhi'}),
+    City('Mumbai', 'Mumbai', {}),
+    City('Kolkata', 'Kolkata', {}),
+    City('Chennai', 'Chennai', {}),
+    City('Bengaluru', 'Bangalore', {'cardekho': 'bangalore', 'goodreturns': 'bangalore', 'acko': 'bangalore'}),
+    City('Hyderabad', 'Hyderabad', {}),
+    City('Ahmedabad', 'Ahmedabad', {}),
+    City('Pune', 'Pune', {}),
+    City('Jaipur', 'Jaipur', {}),
+    City('Lucknow', 'Lucknow', {}),
+    City('Chandigarh', 'Chandigarh', {}),
+    City('Bhopal', 'Bhopal', {}),
+    City('Indore', 'Indore', {}),
+    City('Nagpur', 'Nagpur', {}),
+    City('Surat', 'Surat', {}),
+    City('Patna', 'Patna', {}),
+    City('Ranchi', 'Ranchi', {}),
+    City('Raipur', 'Raipur', {}),
+    City('Bhubaneswar', 'Bhubaneswar', {}),
+    City('Guwahati', 'Guwahati', {}),
+    City('Dehradun', 'Dehradun', {}),
+    City('Shimla', 'Shimla', {}),
+    City('Srinagar', 'Srinagar', {}),
+    City('Gurugram', 'Gurgaon', {'cardekho': 'gurgaon', 'goodreturns': 'gurgaon', 'acko': 'gurgaon', 'businesstoday': 'gurgaon'}),
+    City('Noida', 'Noida', {}),
+    City('Panaji', 'Panaji', {}),
+    City('Kochi', 'Kochi', {'goodreturns': 'ernakulam'}),
+    City('Thiruvananthapuram', 'Thiruvananthapuram', {}),
+    City('Coimbatore', 'Coimbatore', {}),
+    City('Visakhapatnam', 'Visakhapatnam', {}),
+]
+
+_CITIES_BY_NAME = {city.name.lower(): city for city in CITIES}
+
+
+def get_city(name):
+    """
+    Looks up a registered city by name (case-insensitive).
+    Raises KeyError for cities that are not in the registry.
+    """
+    try:
+        return _CITIES_BY_NAME[name.lower()]
+    except KeyError:
+        raise KeyError(f"Unknown city '{name}'. Add it to CITIES in city_registry.py.") from None
+
+
+def city_slug(city, source_name):
+    """
+    Returns the URL slug `source_name` uses for `city`.
+    Defaults to the lower-cased, hyphenated city name.
+    """
+    return city.slugs.get(source_name, city.name.lower().replace(' ', '-'))
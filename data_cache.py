@@ -0,0 +1,93 @@
+# data_cache.py
+import threading
+
+import pandas as pd
+
+from storage import empty_frame, filter_frame, normalize
+
+# Bytes before the last read offset that must be unchanged for the file to
+# count as appended to rather than rewritten (e.g. by `storage.py compact`)
+TAIL_CHECK_BYTES = 256
+
+
+class DataCache:
+    """
+    Keeps the last `history_days` of a store's prices in memory and reloads
+    them when the store's version changes, parsing only appended rows for the
+    CSV store. The frame is shared between callers and must not be modified.
+    """
+
+    def __init__(self, store, history_days=None):
+        self.store = store
+        self.history_days = history_days
+        self.version = None
+        self.frame = empty_frame()
+        self.hits = 0
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self._offset = 0
+        self._tail = b''
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Returns (version, frame), reloading first if the store has changed.
+        Costs one stat() call when it hasn't.
+        """
+        with self._lock:
+            version = self.store.version()
+            if version != self.version:
+                if not (hasattr(self.store, 'read_from') and self._append()):
+                    self._reload()
+                self.version = version
+            else:
+                self.hits += 1
+            return self.version, self.frame
+
+    def _start(self):
+        if self.history_days is None:
+            return None
+        return pd.Timestamp.today().normalize() - pd.Timedelta(days=self.history_days)
+
+    def _trim(self, df):
+        start = self._start()
+        if start is None:
+            return df
+        recent = filter_frame(df, start=start)
+        return recent if not recent.empty else df
+
+    def _read_tail(self):
+        if self._offset == 0:
+            return b''
+        with open(self.store.path, 'rb') as f:
+            f.seek(max(0, self._offset - TAIL_CHECK_BYTES))
+            return f.read(min(self._offset, TAIL_CHECK_BYTES))
+
+    def _append(self):
+        """
+        Parses just the rows added since the last read. Returns False when the
+        file was not simply appended to and needs a full reload.
+        """
+        if self._offset == 0:
+            return False
+        try:
+            if self._read_tail() != self._tail:
+                return False
+        except OSError:
+            return False
+        new_rows, self._offset = self.store.read_from(self._offset)
+        self._tail = self._read_tail()
+        if not new_rows.empty:
+            self.frame = self._trim(normalize(pd.concat([self.frame, normalize(new_rows)], ignore_index=True)))
+        self.incremental_loads += 1
+        return True
+
+    def _reload(self):
+        if hasattr(self.store, 'read_from'):
+            rows, self._offset = self.store.read_from(0)
+            self._tail = self._read_tail()
+            self.frame = self._trim(normalize(rows)) if not rows.empty else empty_frame()
+        else:
+            df = self.store.load(start=self._start())
+            self.frame = df if not df.empty else self.store.load()
+        self.full_loads += 1
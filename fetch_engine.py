@@ -0,0 +1,401 @@
+# fetch_engine.py
+import importlib.util
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from http_cache import HttpCache
+from metrics import observe
+
+# brotli decoding in urllib3 needs one of these packages; only advertise br if
+# present. find_spec checks without importing, urllib3 imports it when decoding
+if importlib.util.find_spec('brotli') or importlib.util.find_spec('brotlicffi'):
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Network defaults shared by every scraper
+REQUEST_TIMEOUT = 10          # Seconds per HTTP request
+MAX_RETRIES = 3               # Extra attempts after a transient failure
+BACKOFF_BASE = 1.0            # Seconds; the backoff window doubles on each retry
+BACKOFF_MAX = 30.0            # Upper bound for a single backoff sleep
+FETCH_DEADLINE = 30           # Seconds gather_prices waits before returning the prices collected so far
+# Seconds polite_get may spend on one URL before it stops retrying; the last
+# attempt still gets its REQUEST_TIMEOUT, so a call ends within about FETCH_DEADLINE
+RETRY_BUDGET = FETCH_DEADLINE - REQUEST_TIMEOUT
+
+# Per-host politeness: (max concurrent requests, requests per second, burst size)
+DEFAULT_HOST_LIMIT = (2, 2.0, 2)
+HOST_LIMITS = {
+    # Override here for hosts that need gentler (or allow faster) crawling, e.g.
+    # 'www.cardekho.com': (1, 1.0, 1),
+}
+
+# Statuses worth retrying; anything else is treated as a hard failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+# Connection pool sizing for the shared session
+POOL_CONNECTIONS = 16         # Distinct hosts kept in the pool
+POOL_MAXSIZE = 16             # Keep-alive connections per host
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `capacity` requests and
+    refills at `rate` tokens per second.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available, then consumes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class HostLimiter:
+    """
+    Politeness limit for a single host.
+    Caps the number of concurrent requests and meters request starts through a
+    token bucket, so different hosts never wait on each other.
+    """
+
+    def __init__(self, max_concurrency, rate, burst):
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(rate, burst)
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        self._bucket.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url):
+    """
+    Returns the shared HostLimiter for the host of `url`, creating it on first use.
+    """
+    host = urlparse(url).netloc.lower()
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(*HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+        return _limiters[host]
+
+
+# Per-thread connection setup timings of the request in flight
+_connect_timings = threading.local()
+
+
+class _TimedConnectionMixin:
+    """
+    Records how long new connections take: `_new_conn` covers DNS resolution
+    plus the TCP handshake, the rest of `connect` is the TLS handshake.
+    Reused keep-alive connections record nothing.
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _connect_timings.connect_ms = (time.perf_counter() - start) * 1000
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        total_ms = (time.perf_counter() - start) * 1000
+        _connect_timings.tls_ms = max(0.0, total_ms - getattr(_connect_timings, 'connect_ms', 0.0))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools use the timed connection classes above.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+_session = None
+_session_lock = threading.Lock()
+_cache = HttpCache()
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session, creating it on first use.
+    One session means keep-alive connections are reused across every page,
+    city and source instead of a new TCP/TLS handshake per request.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = InstrumentedAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def cached_response(url, entry):
+    """
+    Builds a 200 response from a cache entry after the server answered 304.
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response._content = entry['body']
+    response.encoding = entry['meta'].get('encoding')
+    if entry['meta'].get('content_type'):
+        response.headers['Content-Type'] = entry['meta']['content_type']
+    response.from_cache = True
+    return response
+
+
+def backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff: a random delay in [0, base * 2**attempt].
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def polite_get(url, headers=None, timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES, use_cache=True,
+               budget=RETRY_BUDGET):
+    """
+    GETs `url` through the shared session while holding its host's politeness slot.
+    With `use_cache`, the request is made conditional on the last cached copy and
+    a 304 answer is served from the on-disk cache (the response then has
+    `from_cache = True`).
+    Connection errors, timeouts and 429/5xx responses are retried with jittered
+    backoff (honouring Retry-After when the server sends one); other HTTP error
+    statuses raise immediately, like response.raise_for_status(). No retry is
+    started once `budget` seconds (politeness waits included) would be exceeded.
+    """
+    started = time.monotonic()
+    entry = _cache.load(url) if use_cache else None
+    request_headers = dict(headers or {})
+    request_headers.update(_cache.conditional_headers(entry))
+
+    attempt = 0
+    while True:
+        try:
+            response = _timed_get(url, request_headers, timeout)
+            observe(status=response.status_code, attempts=attempt + 1)
+            if response.status_code == 304 and entry is not None:
+                observe(from_cache=True)
+                return cached_response(url, entry)
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                response.raise_for_status()
+                response.from_cache = False
+                observe(from_cache=False)
+                if use_cache:
+                    _cache.store(url, response)
+                return response
+            delay = backoff_delay(attempt)
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = min(BACKOFF_MAX, max(delay, int(retry_after)))
+            if time.monotonic() - started + delay > budget:
+                response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout):
+            observe(attempts=attempt + 1)
+            delay = backoff_delay(attempt)
+            if attempt >= retries or time.monotonic() - started + delay > budget:
+                raise
+        attempt += 1
+        time.sleep(delay)
+
+
+def _timed_get(url, headers, timeout):
+    """
+    One GET through the host limiter, recording the politeness wait, connection
+    setup, time to first byte and body download for the current scraper call.
+    """
+    _connect_timings.connect_ms = _connect_timings.tls_ms = 0.0
+    queued = time.perf_counter()
+    with limiter_for(url):
+        sent = time.perf_counter()
+        response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+        headers_received = time.perf_counter()
+        response.content  # Read the body now so download time is measured here
+        done = time.perf_counter()
+    setup_ms = _connect_timings.connect_ms + _connect_timings.tls_ms
+    observe(
+        wait_ms=(sent - queued) * 1000,
+        connect_ms=_connect_timings.connect_ms,
+        tls_ms=_connect_timings.tls_ms,
+        ttfb_ms=max(0.0, (headers_received - sent) * 1000 - setup_ms),
+        download_ms=(done - headers_received) * 1000,
+    )
+    return response
+
+
+def gather_prices(tasks, keys, quorum=1, deadline=FETCH_DEADLINE, hedge_delays=None):
+    """
+    Runs scraper tasks concurrently and returns once every key has a price.
+
+    `tasks` is an ordered list of (source_name, key, func) where func() returns
+    a price or None; a key is typically a fuel type or a (city, fuel type) pair.
+    Each source gets its own worker lane sized to the default host concurrency,
+    so a slow host only delays its own queue. A key is settled once `quorum`
+    sources have reported a price for it; queued tasks for settled keys are
+    skipped, and among the collected prices the one from the earliest task in
+    `tasks` wins, so the list order still expresses preference.
+
+    With `hedge_delays` (source_name -> seconds), the sources for a key are
+    tried as hedged requests instead of all at once: the next source in line
+    starts when the previous one has been running for its delay, or as soon as
+    it comes back without a price, whichever happens first.
+
+    Returns a dict of key -> (price, source_name) for the keys found, once
+    everything is settled or `deadline` seconds have passed (deadline=None for
+    no limit). Queued tasks are cancelled then, but tasks already running keep
+    their threads until they return, and the interpreter waits for those at
+    exit; polite_get's retry budget is what bounds how long that can be.
+    """
+    wanted = set(keys)
+    found = {key: [] for key in wanted}  # key -> [(task_index, price, source_name)]
+    state = threading.Condition()        # Guards `found`, `release_at` and `stopped`
+    release_at = {}                      # (key, rank) -> monotonic time the task may start
+    stopped = []
+
+    def is_settled(key):
+        return len(found[key]) >= quorum
+
+    def release(key, rank, when):
+        with state:
+            if (key, rank) not in release_at or when < release_at[(key, rank)]:
+                release_at[(key, rank)] = when
+                state.notify_all()
+
+    def wait_turn(key, rank):
+        # Blocks a hedged task until its turn comes; False if it is no longer needed
+        with state:
+            while True:
+                if stopped or is_settled(key):
+                    return False
+                when = release_at.get((key, rank))
+                now = time.monotonic()
+                if when is not None and now >= when:
+                    return True
+                state.wait(timeout=None if when is None else when - now)
+
+    def run_task(index, rank, source_name, key, func):
+        if hedge_delays is not None and rank > 0 and not wait_turn(key, rank):
+            return
+        with state:
+            if is_settled(key):
+                return  # Another source already answered for this key
+        if hedge_delays is not None:
+            release(key, rank + 1, time.monotonic() + hedge_delays.get(source_name, 0))
+        price = None
+        try:
+            price = func()
+        except Exception as e:
+            print(f"Error with {source_name} ({key}): {e}")
+        finally:
+            if price is None:
+                release(key, rank + 1, time.monotonic())
+        if price is not None:
+            with state:
+                found[key].append((index, price, source_name))
+                state.notify_all()
+
+    lanes = {}
+    futures = set()
+    ranks = {}
+    for index, (source_name, key, func) in enumerate(tasks):
+        if key not in wanted:
+            continue
+        rank = ranks.get(key, 0)
+        ranks[key] = rank + 1
+        if source_name not in lanes:
+            lanes[source_name] = ThreadPoolExecutor(max_workers=DEFAULT_HOST_LIMIT[0],
+                                                    thread_name_prefix=source_name)
+        futures.add(lanes[source_name].submit(run_task, index, rank, source_name, key, func))
+
+    started = time.monotonic()
+    try:
+        pending = futures
+        while pending:
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0:
+                print(f"WARNING: Fetch deadline of {deadline}s reached, using prices collected so far.")
+                break
+            _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            with state:
+                if all(is_settled(key) for key in wanted):
+                    break
+    finally:
+        # Wake any hedged task still waiting for a turn that will never come
+        with state:
+            stopped.append(True)
+            state.notify_all()
+        for lane in lanes.values():
+            lane.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    with state:
+        for key, candidates in found.items():
+            if candidates:
+                _, price, source_name = min(candidates)
+                results[key] = (price, source_name)
+    return results
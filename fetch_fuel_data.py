@@ -1,412 +1,255 @@
 # fetch_fuel_data.py
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
+import argparse
 import os
-import re
-import time
+from functools import partial
 
-# Define the CSV file where fuel price data will be stored
-FUEL_DATA_FILE = 'fuel_prices.csv'
+from browser_pool import close_browser_pool, get_browser_pool
+from city_registry import CITIES, FUEL_TYPES, get_city
+from fetch_engine import gather_prices, polite_get, FETCH_DEADLINE
+from metrics import run_metrics
+from price_extractor import extract_price
+from source_health import SourceHealth
+from sources import load_sources, source_patterns, source_url
+from storage import get_store
+from validation import PriceValidator
 
-def scrape_cardekho():
+# Retry pages without a static price in a headless browser (needs requirements-browser.txt)
+BROWSER_FALLBACK = os.environ.get('FUEL_BROWSER_FALLBACK', '') in ('1', 'true', 'yes')
+
+# Last known New Delhi prices, used when every source fails for that fuel
+FALLBACK_PRICES = {
+    ('New Delhi', 'Petrol'): 94.77,  # Based on search results
+    ('New Delhi', 'Diesel'): 87.67,  # Based on search results
+}
+
+def scrape(spec, city, fuel_type, validator=None, render=False):
     """
-    Try to scrape from cardekho.com - seems to have reliable data based on search results
+    Fetches one source page described by `spec` and extracts the price for
+    `fuel_type` from it. Every source runs through here, so they all share
+    the pooled session, cache, host limits and metrics. With a `validator`,
+    a price that is anomalous for the series is held back (None is returned,
+    so the next source gets asked) unless other sources confirm it. With
+    `render`, the page is loaded in a pooled headless browser instead.
     """
-    print("Trying cardekho.com...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
-    
-    petrol_price = None
-    diesel_price = None
-    
-    try:
-        # Try petrol price
-        petrol_url = 'https://www.cardekho.com/petrol-price-in-delhi-state'
-        response = requests.get(petrol_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Look for price patterns specific to cardekho
-        page_text = soup.get_text()
-        
-        # More specific patterns for cardekho
-        petrol_patterns = [
-            r'Today.{0,20}s Petrol price in Delhi stands at ₹\s*(\d+\.?\d*)\s*per litre',
-            r'Petrol price in Delhi stands at ₹\s*(\d+\.?\d*)',
-            r'₹\s*(\d+\.?\d*)\s*per litre.*petrol',
-        ]
-        
-        for pattern in petrol_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                # Updated realistic range for petrol (₹85-105)
-                if 85 <= potential_price <= 105:
-                    petrol_price = potential_price
-                    print(f"Found petrol price from cardekho: ₹{petrol_price}")
-                    break
-            if petrol_price:
-                break
-        
-        time.sleep(1)  # Be respectful to the server
-        
-        # Try diesel price
-        diesel_url = 'https://www.cardekho.com/diesel-price-in-delhi-state'
-        response = requests.get(diesel_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        page_text = soup.get_text()
-        
-        diesel_patterns = [
-            r'Diesel price in Delhi stands at ₹\s*(\d+\.?\d*)\s*per litre',
-            r'average Diesel price in Delhi stands at ₹\s*(\d+\.?\d*)',
-            r'₹\s*(\d+\.?\d*)\s*per litre.*diesel',
-        ]
-        
-        for pattern in diesel_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                # Updated realistic range for diesel (₹80-95)
-                if 80 <= potential_price <= 95:
-                    diesel_price = potential_price
-                    print(f"Found diesel price from cardekho: ₹{diesel_price}")
-                    break
-            if diesel_price:
-                break
-        
-        return petrol_price, diesel_price
-        
-    except Exception as e:
-        print(f"Error scraping cardekho: {e}")
-        return None, None
+    url = source_url(spec, city, fuel_type)
+    price_range = (spec.price_ranges or {}).get(fuel_type)
+    # Browser calls are timed separately so they don't skew the source's static-fetch health
+    call_source = f'{spec.name}-browser' if render else spec.name
+    patterns = source_patterns(spec, city, fuel_type)
+    with run_metrics.scraper_call(call_source, city.name, fuel_type, url) as call:
+        html = get_browser_pool().render(url, spec.xpaths, patterns) if render else polite_get(url).text
+        price = extract_price(html, patterns, fuel_type, xpaths=spec.xpaths, price_range=price_range)
+        if price is not None and validator is not None:
+            accepted, call['anomaly_score'] = validator.check(city.name, fuel_type, price, spec.name)
+            if not accepted:
+                print(f"WARNING: {spec.name} reports {fuel_type} in {city.name} at ₹{price}, "
+                      f"far from its recent level; holding it back")
+                call['rejected_price'] = price
+                price = None
+        call['price'] = price
+    if price is not None:
+        print(f"Found {fuel_type} price for {city.name} from {call_source}: ₹{price}")
+    return price
 
-def scrape_goodreturns():
+# Sources in order of preference: the built-in specs plus any from FUEL_SOURCES_FILE
+SOURCES = load_sources()
+
+def build_tasks(cities, fuel_types, source_order=None, validator=None, render=False, keys=None):
     """
-    Try to scrape from goodreturns.in - updated with better patterns
+    Expands SOURCES into one (source_name, (city, fuel_type), func) task per page.
+    `source_order` lists the source names to use, best first (None: SOURCES order).
+    Tasks are ordered source-first, so every city's preferred source is queued
+    before any fallback source and fallbacks are skipped once a price is in.
+    With `render`, only sources marked render=True get (browser) tasks; `keys`
+    limits the tasks to those (city_name, fuel_type) pairs.
     """
-    print("Trying goodreturns.in...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
-    
-    try:
-        # Try petrol price
-        petrol_url = 'https://www.goodreturns.in/petrol-price-in-new-delhi.html'
-        response = requests.get(petrol_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        petrol_price = None
-        page_text = soup.get_text()
-        
-        # Look for more specific patterns
-        petrol_patterns = [
-            r'Rs\.\s*(\d+\.?\d*)/Ltr',
-            r'₹\s*(\d+\.?\d*)\s*per\s*litre',
-            r'Today.*Delhi.*₹\s*(\d+\.?\d*)',
-            r'New Delhi Petrol Price.*Rs\.\s*(\d+\.?\d*)',
-        ]
-        
-        for pattern in petrol_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                # Updated realistic range for petrol (₹85-105)
-                if 85 <= potential_price <= 105:
-                    petrol_price = potential_price
-                    print(f"Found petrol price from goodreturns: ₹{petrol_price}")
-                    break
-            if petrol_price:
-                break
-        
-        time.sleep(1)  # Be respectful to the server
-        
-        # Try diesel price
-        diesel_url = 'https://www.goodreturns.in/diesel-price-in-new-delhi.html'
-        response = requests.get(diesel_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        diesel_price = None
-        page_text = soup.get_text()
-        
-        diesel_patterns = [
-            r'Rs\.\s*(\d+\.?\d*)/Ltr',
-            r'₹\s*(\d+\.?\d*)\s*per\s*litre',
-            r'Today.*Delhi.*₹\s*(\d+\.?\d*)',
-            r'New Delhi Diesel Price.*Rs\.\s*(\d+\.?\d*)',
-        ]
-        
-        for pattern in diesel_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                # Updated realistic range for diesel (₹80-95)
-                if 80 <= potential_price <= 95:
-                    diesel_price = potential_price
-                    print(f"Found diesel price from goodreturns: ₹{diesel_price}")
-                    break
-            if diesel_price:
-                break
-        
-        return petrol_price, diesel_price
-        
-    except Exception as e:
-        print(f"Error scraping goodreturns: {e}")
-        return None, None
+    specs = {spec.name: spec for spec in SOURCES}
+    tasks = []
+    for name in list(specs) if source_order is None else source_order:
+        spec = specs[name]
+        if render and not spec.render:
+            continue
+        for city in cities:
+            for fuel_type in fuel_types:
+                if fuel_type in spec.fuel_types and (keys is None or (city.name, fuel_type) in keys):
+                    tasks.append((name, (city.name, fuel_type),
+                                  partial(scrape, spec, city, fuel_type, validator, render)))
+    return tasks
 
-def scrape_acko():
+def load_validator(store=None):
     """
-    Try to scrape from acko.com - updated based on search results
+    Returns the price validator with its saved running statistics. The first
+    time there are none, they are built from the stored history once.
     """
-    print("Trying acko.com...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    }
-    
-    petrol_price = None
-    diesel_price = None
-    
-    try:
-        # Try diesel price from Acko
-        diesel_url = 'https://www.acko.com/fuel/diesel-price-in-new-delhi/'
-        response = requests.get(diesel_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        page_text = soup.get_text()
-        
-        # Updated patterns based on search results showing "87.67,/ per litre"
-        diesel_patterns = [
-            r'(\d+\.?\d*),/\s*per\s*litre',
-            r'₹\s*(\d+\.?\d*)\s*per\s*litre',
-            r'Today.*(\d+\.?\d*)\s*per\s*litre',
-            r'Diesel Price.*(\d+\.?\d*)',
-        ]
-        
-        for pattern in diesel_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                if 80 <= potential_price <= 95:  # Reasonable diesel price range
-                    diesel_price = potential_price
-                    print(f"Found diesel price from acko: ₹{diesel_price}")
-                    break
-            if diesel_price:
-                break
-        
-        time.sleep(1)
-        
-        # Try petrol price from Acko
-        try:
-            petrol_url = 'https://www.acko.com/fuel/petrol-price-in-new-delhi/'
-            response = requests.get(petrol_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            page_text = soup.get_text()
-            
-            petrol_patterns = [
-                r'(\d+\.?\d*),/\s*per\s*litre',
-                r'₹\s*(\d+\.?\d*)\s*per\s*litre',
-                r'Today.*(\d+\.?\d*)\s*per\s*litre',
-                r'Petrol Price.*(\d+\.?\d*)',
-            ]
-            
-            for pattern in petrol_patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
-                for match in matches:
-                    potential_price = float(match)
-                    if 85 <= potential_price <= 105:  # Reasonable petrol price range
-                        petrol_price = potential_price
-                        print(f"Found petrol price from acko: ₹{petrol_price}")
-                        break
-                if petrol_price:
-                    break
-        except Exception as pe:
-            print(f"Error getting petrol from acko: {pe}")
-        
-        return petrol_price, diesel_price
-        
-    except Exception as e:
-        print(f"Error scraping acko: {e}")
-        return None, None
+    validator = PriceValidator()
+    if validator.empty and store is not None:
+        rejected = validator.observe_rows(store.rows())
+        print(f"Built price statistics for {len(validator.series)} series from history ({rejected} anomalous rows)")
+    return validator
 
-def scrape_businesstoday():
+def fetch_prices(cities, fuel_types, store=None, browser_fallback=False):
     """
-    Try to scrape from businesstoday.in - new source based on search results
+    Fetches prices for every (city, fuel type) pair in one batch.
+    Sources are tried fastest-first according to their recorded health, sources
+    with an open circuit breaker are skipped, and the next source is only asked
+    once the previous one is slower than its usual p95 (or comes back empty or
+    with an anomalous price). With `browser_fallback`, pairs still missing
+    after that are retried by rendering the render=True sources in pooled
+    headless browsers. Returns a dict of (city_name, fuel_type) -> price for
+    the pairs found.
     """
-    print("Trying businesstoday.in...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-    }
-    
-    try:
-        petrol_url = 'https://www.businesstoday.in/fuel-price/petrol-price-in-delhi-today'
-        response = requests.get(petrol_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        petrol_price = None
-        page_text = soup.get_text()
-        
-        # Look for price patterns
-        petrol_patterns = [
-            r'₹(\d+\.?\d*)\s*per\s*litre',
-            r'stood at ₹(\d+\.?\d*)',
-            r'price.*Delhi.*₹(\d+\.?\d*)',
-        ]
-        
-        for pattern in petrol_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                potential_price = float(match)
-                if 85 <= potential_price <= 105:  # Reasonable petrol price range
-                    petrol_price = potential_price
-                    print(f"Found petrol price from businesstoday: ₹{petrol_price}")
-                    break
-            if petrol_price:
-                break
-        
-        return petrol_price, None
-        
-    except Exception as e:
-        print(f"Error scraping businesstoday: {e}")
-        return None, None
+    health = SourceHealth()
+    validator = load_validator(store)
+    names = [spec.name for spec in SOURCES]
+    order = health.order(names)
+    for name in names:
+        if name not in order:
+            print(f"Skipping {name}: circuit open after repeated failures")
+    print(f"Source order: {', '.join(order)}")
+
+    keys = [(city.name, fuel_type) for city in cities for fuel_type in fuel_types]
+    # A single city keeps the short deadline; a nationwide sweep is bounded by
+    # the per-host rate limits instead
+    deadline = FETCH_DEADLINE if len(cities) == 1 else None
+    first_call = len(run_metrics.calls)
+    prices = gather_prices(build_tasks(cities, fuel_types, order, validator), keys, deadline=deadline,
+                           hedge_delays={name: health.hedge_delay(name) for name in order})
+
+    missing = [key for key in keys if key not in prices]
+    if browser_fallback and missing:
+        # The static circuit is no guide here (a client-rendered page always
+        # fails statically), so the browser tier has its own health entries
+        browser_order = [spec.name for spec in SOURCES
+                         if spec.render and not health.is_open(f'{spec.name}-browser')]
+        if not browser_order:
+            print("Skipping the headless browser: every render source has its circuit open")
+        else:
+            print(f"Rendering {len(missing)} missing prices in a headless browser ({', '.join(browser_order)})")
+            try:
+                prices.update(gather_prices(
+                    build_tasks(cities, fuel_types, browser_order, validator, render=True, keys=set(missing)),
+                    missing, deadline=deadline,
+                    hedge_delays={name: health.hedge_delay(f'{name}-browser') for name in browser_order}))
+            finally:
+                close_browser_pool()
 
-def fetch_and_save_data():
+    # Remember how each source did for the next run's ordering and breakers
+    health.record_calls(run_metrics.calls[first_call:])
+    health.save()
+    prices = {key: price for key, (price, _) in prices.items()}
+    validator.finish_run(prices)
+    validator.save()
+    return prices
+
+def resolve_city_rows(city_name, fuel_types, prices, today, held_back=()):
     """
-    Fetches daily petrol and diesel prices for New Delhi using multiple sources
+    Applies fallbacks and sanity checks to one city's scraped prices.
+    `held_back` holds the (city_name, fuel_type) pairs whose scraped price the
+    validator rejected; those get no fallback row, since the hardcoded price
+    may be the very level the market has moved away from.
+    Returns the rows to save for that city (possibly none).
     """
-    print("Starting fuel price fetch process...")
-    print("=" * 50)
-    
-    petrol_price = None
-    diesel_price = None
-    
-    # Try multiple sources until we get both prices
-    sources = [
-        scrape_cardekho,      # Based on search results, this seems most reliable
-        scrape_goodreturns,
-        scrape_acko,
-        scrape_businesstoday,
+    city_prices = {fuel_type: prices.get((city_name, fuel_type)) for fuel_type in fuel_types}
+
+    # Check what we found
+    if all(price is None for price in city_prices.values()):
+        print(f"ERROR: Could not fetch any fuel prices for {city_name} from any source.")
+        return []
+
+    # Use fallback prices based on recent search results if scraping fails
+    for fuel_type, price in city_prices.items():
+        if price is None and (city_name, fuel_type) in held_back:
+            print(f"WARNING: {fuel_type} price for {city_name} was held back as anomalous; not saving one today")
+        elif price is None and (city_name, fuel_type) in FALLBACK_PRICES:
+            print(f"WARNING: Could not fetch {fuel_type.lower()} price for {city_name}, using last known price")
+            city_prices[fuel_type] = FALLBACK_PRICES[(city_name, fuel_type)]
+            run_metrics.record_fallback(city_name, fuel_type, city_prices[fuel_type])
+
+    petrol_price = city_prices.get('Petrol')
+    diesel_price = city_prices.get('Diesel')
+
+    # Validation check - don't save obviously wrong data
+    if petrol_price is not None and petrol_price == diesel_price:
+        print(f"ERROR: Petrol and diesel prices for {city_name} are identical, likely scraping error")
+        return []
+
+    return [
+        {'Date': today, 'City': city_name, 'FuelType': fuel_type, 'Price': price}
+        for fuel_type, price in city_prices.items() if price is not None
     ]
-    
-    for source_func in sources:
-        if petrol_price is None or diesel_price is None:
-            try:
-                p_price, d_price = source_func()
-                
-                if p_price is not None and petrol_price is None:
-                    petrol_price = p_price
-                
-                if d_price is not None and diesel_price is None:
-                    diesel_price = d_price
-                
-                # Small delay between requests to be respectful
-                time.sleep(2)  # Increased delay
-                
-            except Exception as e:
-                print(f"Error with {source_func.__name__}: {e}")
-                continue
-        
-        # If we have both prices, we can stop
-        if petrol_price is not None and diesel_price is not None:
-            break
-    
+
+def fetch_and_save_data(city_names=None, fuel_types=None, storage_backend=None, browser_fallback=None):
+    """
+    Fetches daily fuel prices for the given cities (New Delhi petrol and diesel
+    by default) using multiple sources and upserts them into the price store.
+    `browser_fallback` defaults to the FUEL_BROWSER_FALLBACK environment variable.
+    """
+    if browser_fallback is None:
+        browser_fallback = BROWSER_FALLBACK
+    cities = [get_city(name) for name in (city_names or ['New Delhi'])]
+    fuel_types = fuel_types or ['Petrol', 'Diesel']
+
+    print(f"Starting fuel price fetch process for {len(cities)} cities x {len(fuel_types)} fuel types...")
     print("=" * 50)
-    
-    # Check what we found
-    if petrol_price is None and diesel_price is None:
+
+    store = get_store(storage_backend)
+
+    # Hit every source for every page at once; per-host limits in fetch_engine
+    # keep us polite, and we return as soon as every price is in
+    prices = fetch_prices(cities, fuel_types, store, browser_fallback)
+
+    print("=" * 50)
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    held_back = {(call['city'], call['fuel_type']) for call in run_metrics.calls
+                 if call.get('rejected_price') is not None}
+    rows = []
+    for city in cities:
+        rows.extend(resolve_city_rows(city.name, fuel_types, prices, today, held_back))
+
+    if not rows:
         print("ERROR: Could not fetch any fuel prices from any source.")
         print("All websites may be down or have changed their structure.")
         return
-    
-    # Use fallback prices based on recent search results if scraping fails
-    if petrol_price is None:
-        print("WARNING: Could not fetch petrol price, using last known price")
-        petrol_price = 94.77  # Based on search results
-    
-    if diesel_price is None:
-        print("WARNING: Could not fetch diesel price, using last known price") 
-        diesel_price = 87.67  # Based on search results
-    
-    print(f"Final prices - Petrol: ₹{petrol_price}, Diesel: ₹{diesel_price}")
-    
-    # Validation check - ensure prices are reasonable
-    if not (85 <= petrol_price <= 105) or not (80 <= diesel_price <= 95):
-        print(f"WARNING: Prices seem unrealistic. Petrol: {petrol_price}, Diesel: {diesel_price}")
-        # Don't save obviously wrong data
-        if petrol_price == diesel_price:
-            print("ERROR: Petrol and diesel prices are identical, likely scraping error")
-            return
-    
-    # Save data to CSV
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    new_data = pd.DataFrame([
-        {'Date': today, 'City': 'New Delhi', 'FuelType': 'Petrol', 'Price': petrol_price},
-        {'Date': today, 'City': 'New Delhi', 'FuelType': 'Diesel', 'Price': diesel_price}
-    ])
-    
-    # Handle CSV file operations with proper error handling
-    if os.path.exists(FUEL_DATA_FILE):
-        try:
-            existing_data = pd.read_csv(FUEL_DATA_FILE)
-            
-            # Check if the CSV file is empty or has no columns
-            if existing_data.empty or len(existing_data.columns) == 0:
-                print("Existing CSV file is empty or corrupted, creating new one.")
-                updated_data = new_data
-            else:
-                existing_data['Date'] = pd.to_datetime(existing_data['Date']).dt.strftime('%Y-%m-%d')
-                
-                # Check if today's data already exists
-                today_exists = existing_data[
-                    (existing_data['Date'] == today) & 
-                    (existing_data['City'] == 'New Delhi')
-                ]
-                
-                if not today_exists.empty:
-                    print(f"Data for {today} in New Delhi already exists. Updating with new prices.")
-                    # Remove today's data and add new data
-                    existing_data = existing_data[
-                        ~((existing_data['Date'] == today) & (existing_data['City'] == 'New Delhi'))
-                    ]
-                
-                updated_data = pd.concat([existing_data, new_data], ignore_index=True)
-        
-        except (pd.errors.EmptyDataError, pd.errors.ParserError, KeyError) as e:
-            print(f"Error reading existing CSV file: {e}")
-            print("Creating new CSV file.")
-            updated_data = new_data
-    else:
-        print("Creating new CSV file.")
-        updated_data = new_data
-    
-    # Save to CSV
-    updated_data.to_csv(FUEL_DATA_FILE, index=False)
-    print(f"Successfully saved data for {today} to {FUEL_DATA_FILE}")
-    
+
+    # Upsert today's rows; the store appends (CSV) or does keyed writes
+    # (SQLite), so the existing history is never re-read or rewritten
+    store.upsert(rows)
+    print(f"Successfully saved data for {today} to {store.path}")
+
     # Show what was saved
     print("\nData saved:")
-    print(new_data.to_string(index=False))
+    print(f"{'Date':<12}{'City':<20}{'FuelType':<10}{'Price':>8}")
+    for row in rows:
+        print(f"{row['Date']:<12}{row['City']:<20}{row['FuelType']:<10}{row['Price']:>8.2f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fetch today's fuel prices and save them to the price store.")
+    parser.add_argument('--cities', nargs='+', metavar='CITY',
+                        help="Cities to fetch (default: New Delhi)")
+    parser.add_argument('--all-cities', action='store_true',
+                        help="Fetch every city in city_registry.CITIES")
+    parser.add_argument('--fuels', nargs='+', choices=FUEL_TYPES, metavar='FUEL',
+                        help=f"Fuel types to fetch, from {FUEL_TYPES} (default: Petrol Diesel)")
+    parser.add_argument('--storage', choices=['csv', 'sqlite', 'parquet'],
+                        help="Storage backend (default: the FUEL_STORAGE environment variable, else csv)")
+    parser.add_argument('--browser-fallback', action='store_true', default=None,
+                        help="Render pages without a static price in a headless browser "
+                             "(default: the FUEL_BROWSER_FALLBACK environment variable)")
+    parser.add_argument('--metrics-json', metavar='PATH',
+                        help="Write a JSON run report with per-source timings and outcomes")
+    parser.add_argument('--metrics-prom', metavar='PATH',
+                        help="Write the run metrics in Prometheus text format")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    fetch_and_save_data()
\ No newline at end of file
+    args = parse_args()
+    city_names = [city.name for city in CITIES] if args.all_cities else args.cities
+    try:
+        fetch_and_save_data(city_names, args.fuels, args.storage, args.browser_fallback)
+    finally:
+        if args.metrics_json:
+            run_metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            run_metrics.write_prometheus(args.metrics_prom)
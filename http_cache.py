@@ -0,0 +1,79 @@
+# http_cache.py
+import hashlib
+import json
+import os
+import threading
+
+# Directory for cached pages; override with the FUEL_HTTP_CACHE_DIR environment variable
+HTTP_CACHE_DIR = os.environ.get('FUEL_HTTP_CACHE_DIR', '.http_cache')
+
+
+class HttpCache:
+    """
+    Minimal on-disk cache for conditional GETs.
+    Stores each page body next to a small JSON file with its validators
+    (ETag / Last-Modified), so a later request can send If-None-Match /
+    If-Modified-Since and reuse the stored body when the server answers 304.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return base + '.json', base + '.body'
+
+    def load(self, url):
+        """
+        Returns the cached entry for `url` as a dict with 'meta' and 'body', or None.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return {'meta': meta, 'body': body}
+
+    def conditional_headers(self, entry):
+        """
+        Returns the validator headers to send for a cached entry.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['meta'].get('etag'):
+            headers['If-None-Match'] = entry['meta']['etag']
+        if entry['meta'].get('last_modified'):
+            headers['If-Modified-Since'] = entry['meta']['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """
+        Saves a 200 response if the server gave us a validator to revalidate it with.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        meta = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': response.encoding,
+            'content_type': response.headers.get('Content-Type'),
+        }
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write the body first and the metadata last, via temp files, so a
+            # crash never leaves metadata pointing at a half-written body
+            for path, data, mode in ((body_path, response.content, 'wb'),
+                                     (meta_path, json.dumps(meta), 'w')):
+                tmp_path = path + '.tmp'
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
@@ -0,0 +1,180 @@
+# metrics.py
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Stage timings recorded for every scraper call, in milliseconds
+STAGES = ['wait_ms', 'connect_ms', 'tls_ms', 'ttfb_ms', 'download_ms', 'parse_ms', 'extract_ms', 'total_ms']
+
+_local = threading.local()
+
+
+class RunMetrics:
+    """
+    Collects one record per scraper call (source, city, fuel type, stage
+    timings, HTTP status, matched pattern, outcome) plus fallback usage, and
+    renders them as a JSON run report or Prometheus text exposition.
+    """
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self.calls = []
+        self.fallbacks = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scraper_call(self, source, city, fuel_type, url):
+        """
+        Context for one scraper call. Code running inside it on the same thread
+        (fetch_engine, price_extractor) adds to the record through observe().
+        """
+        record = {'source': source, 'city': city, 'fuel_type': fuel_type, 'url': url,
+                  'status': None, 'from_cache': None, 'attempts': 0, 'pattern': None,
+                  'price': None, 'error': None}
+        previous = getattr(_local, 'record', None)
+        _local.record = record
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['total_ms'] = (time.perf_counter() - start) * 1000
+            _local.record = previous
+            with self._lock:
+                self.calls.append(record)
+
+    def record_fallback(self, city, fuel_type, price):
+        with self._lock:
+            self.fallbacks.append({'city': city, 'fuel_type': fuel_type, 'price': price})
+
+    def source_summary(self):
+        """
+        Aggregates the calls per source: call count, success rate and median / p95 total time.
+        """
+        by_source = {}
+        for call in self.calls:
+            by_source.setdefault(call['source'], []).append(call)
+        summary = {}
+        for source, calls in by_source.items():
+            durations = sorted(call['total_ms'] for call in calls)
+            successes = sum(1 for call in calls if call['price'] is not None)
+            summary[source] = {
+                'calls': len(calls),
+                'successes': successes,
+                'success_rate': successes / len(calls),
+                'errors': sum(1 for call in calls if call['error'] is not None),
+                'p50_ms': percentile(durations, 50),
+                'p95_ms': percentile(durations, 95),
+            }
+        return summary
+
+    def report(self):
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'sources': self.source_summary(),
+            'fallbacks': self.fallbacks,
+            'calls': self.calls,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2, default=str)
+
+    def to_prometheus(self):
+        """
+        Renders the run in the Prometheus text exposition format.
+        """
+        lines = [
+            '# HELP fuel_scraper_calls_total Scraper calls by source and outcome.',
+            '# TYPE fuel_scraper_calls_total counter',
+        ]
+        outcomes = {}
+        for call in self.calls:
+            outcome = 'error' if call['error'] else ('found' if call['price'] is not None else 'not_found')
+            key = (call['source'], outcome)
+            outcomes[key] = outcomes.get(key, 0) + 1
+        for (source, outcome), count in sorted(outcomes.items()):
+            lines.append(f'fuel_scraper_calls_total{{source="{source}",outcome="{outcome}"}} {count}')
+
+        lines += [
+            '# HELP fuel_scraper_http_responses_total HTTP responses by source and status code.',
+            '# TYPE fuel_scraper_http_responses_total counter',
+        ]
+        statuses = {}
+        for call in self.calls:
+            if call['status'] is not None:
+                key = (call['source'], call['status'])
+                statuses[key] = statuses.get(key, 0) + 1
+        for (source, status), count in sorted(statuses.items()):
+            lines.append(f'fuel_scraper_http_responses_total{{source="{source}",code="{status}"}} {count}')
+
+        lines += [
+            '# HELP fuel_scraper_stage_seconds Time spent per scraper stage.',
+            '# TYPE fuel_scraper_stage_seconds summary',
+        ]
+        for source in sorted({call['source'] for call in self.calls}):
+            calls = [call for call in self.calls if call['source'] == source]
+            for stage in STAGES:
+                values = [call[stage] for call in calls if call.get(stage) is not None]
+                if values:
+                    name = stage[:-len('_ms')]
+                    labels = f'source="{source}",stage="{name}"'
+                    lines.append(f'fuel_scraper_stage_seconds_sum{{{labels}}} {sum(values) / 1000:.6f}')
+                    lines.append(f'fuel_scraper_stage_seconds_count{{{labels}}} {len(values)}')
+
+        lines += [
+            '# HELP fuel_scraper_success_ratio Share of calls that returned a valid price.',
+            '# TYPE fuel_scraper_success_ratio gauge',
+        ]
+        for source, stats in sorted(self.source_summary().items()):
+            lines.append(f'fuel_scraper_success_ratio{{source="{source}"}} {stats["success_rate"]:.4f}')
+
+        lines += [
+            '# HELP fuel_price_fallback_total Prices filled in from the hardcoded last known value.',
+            '# TYPE fuel_price_fallback_total counter',
+        ]
+        fallbacks = {}
+        for fallback in self.fallbacks:
+            key = (fallback['city'], fallback['fuel_type'])
+            fallbacks[key] = fallbacks.get(key, 0) + 1
+        for (city, fuel_type), count in sorted(fallbacks.items()):
+            lines.append(f'fuel_price_fallback_total{{city="{city}",fuel_type="{fuel_type}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list (None when empty).
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def observe(**fields):
+    """
+    Adds fields to the current thread's scraper call record, if there is one.
+    Numeric stage timings accumulate, so retries add up instead of overwriting.
+    """
+    record = getattr(_local, 'record', None)
+    if record is None:
+        return
+    for name, value in fields.items():
+        if name in STAGES and record.get(name) is not None:
+            record[name] += value
+        else:
+            record[name] = value
+
+
+# Metrics for the current process run
+run_metrics = RunMetrics()
@@ -0,0 +1,105 @@
+# price_extractor.py
+import importlib.util
+import re
+import time
+from functools import lru_cache
+
+from metrics import observe
+
+# lxml parses an order of magnitude faster than bs4's html.parser; fall back
+# to BeautifulSoup when it isn't installed. Either is only imported when the
+# first page is parsed, so runs that never get a page don't pay for it.
+HAVE_LXML = importlib.util.find_spec('lxml') is not None
+
+# Plausible nationwide price bands, used only to tell a price from stray
+# numbers on a page (₹/litre for petrol and diesel, ₹/kg for CNG, ₹/14.2 kg
+# cylinder for LPG). Whether a price is right for its city is judged
+# against that series' own history by validation.PriceValidator.
+PRICE_RANGES = {
+    'Petrol': (80, 125),
+    'Diesel': (70, 115),
+    'CNG': (50, 110),
+    'LPG': (700, 1300),
+}
+
+
+@lru_cache(maxsize=None)
+def _lxml_parser():
+    """
+    Imports lxml and builds its UTF-8 HTML parser on first use.
+    """
+    import lxml.html
+    return lxml.html, lxml.html.HTMLParser(encoding='utf-8')
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    """
+    Compiles a price pattern once per process.
+    Patterns are built per city, so there are more of them than the `re`
+    module's own cache holds; keeping them here avoids recompiling every run.
+    """
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def page_text(html, xpaths=None):
+    """
+    Returns the text of the price container(s) matched by `xpaths`, or of the
+    whole page when no container is configured or none of them match.
+    """
+    if not HAVE_LXML:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'html.parser').get_text()
+
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration, so
+        # hand it UTF-8 bytes and say so rather than letting it guess latin-1
+        html = html.encode('utf-8')
+    lxml_html, parser = _lxml_parser()
+    root = lxml_html.fromstring(html, parser=parser)
+    for xpath in xpaths or []:
+        nodes = root.xpath(xpath)
+        if nodes:
+            return '\n'.join(node.text_content() for node in nodes)
+    return root.text_content()
+
+
+def match_price(text, patterns, fuel_type, price_range=None):
+    """
+    Scans `text` with each pattern in order and returns (price, pattern_index)
+    for the first captured number inside `price_range` (default: the realistic
+    range for `fuel_type`), or (None, None). Matching stops at the first valid
+    price instead of collecting every match.
+    """
+    low, high = price_range or PRICE_RANGES[fuel_type]
+    for index, pattern in enumerate(patterns):
+        for match in compile_pattern(pattern).finditer(text):
+            try:
+                potential_price = float(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+            if low <= potential_price <= high:
+                return potential_price, index
+    return None, None
+
+
+def find_price(text, patterns, fuel_type, price_range=None):
+    """
+    Returns the first valid price for `fuel_type` in `text`, or None.
+    """
+    return match_price(text, patterns, fuel_type, price_range)[0]
+
+
+def extract_price(html, patterns, fuel_type, xpaths=None, price_range=None):
+    """
+    Extracts the price for `fuel_type` from a raw HTML page, recording parse
+    and extraction time and the index of the matching pattern in the metrics.
+    """
+    start = time.perf_counter()
+    text = page_text(html, xpaths)
+    parsed = time.perf_counter()
+    price, pattern_index = match_price(text, patterns, fuel_type, price_range)
+    observe(parse_ms=(parsed - start) * 1000,
+            extract_ms=(time.perf_counter() - parsed) * 1000,
+            pattern=pattern_index)
+    return price
@@ -0,0 +1,134 @@
+# profiling.py
+import cProfile
+import importlib.util
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from metrics import percentile
+
+# Opt-in instrumentation for the dashboard: set FUEL_PROFILE=1 before `streamlit run app.py`
+PROFILE_ENABLED = os.environ.get('FUEL_PROFILE', '').lower() in ('1', 'true', 'yes')
+# Where on-demand profiler reports are written; override with FUEL_PROFILE_DIR
+PROFILE_DIR = os.environ.get('FUEL_PROFILE_DIR', 'profiles')
+PROFILE_WINDOW = 500          # Most recent timings kept per stage for the percentiles
+PROFILE_LINES = 40            # Functions listed in a cProfile text report
+
+HAVE_PYINSTRUMENT = importlib.util.find_spec('pyinstrument') is not None
+PROFILERS = ['cProfile'] + (['pyinstrument'] if HAVE_PYINSTRUMENT else [])
+
+
+class StageTimings:
+    """
+    Rolling wall-clock timings of named stages, in milliseconds, kept for the
+    last PROFILE_WINDOW runs of each stage so percentiles follow the current
+    data rather than the whole process lifetime. Safe to share between
+    Streamlit sessions.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def record(self, name, ms):
+        with self._lock:
+            self.samples.setdefault(name, deque(maxlen=self.window)).append(ms)
+
+    def summary(self):
+        """
+        Returns one row per stage, in first-recorded order: run count, the
+        latest time and p50 / p95 over the window.
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        rows = []
+        for name, values in samples.items():
+            ordered = sorted(values)
+            rows.append({
+                'stage': name,
+                'runs': len(values),
+                'last_ms': round(values[-1], 2),
+                'p50_ms': round(percentile(ordered, 50), 2),
+                'p95_ms': round(percentile(ordered, 95), 2),
+            })
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+
+
+def stage(name):
+    """
+    Times a block into app_timings when profiling is enabled; a no-op context
+    otherwise, so the instrumented code paths cost nothing by default.
+    """
+    return app_timings.stage(name) if PROFILE_ENABLED else nullcontext()
+
+
+class RerunProfiler:
+    """
+    Profiles one stretch of code with cProfile or pyinstrument (if installed)
+    and writes the report to PROFILE_DIR: a .prof file plus a text summary
+    for cProfile, an HTML flame view plus a text tree for pyinstrument.
+    """
+
+    def __init__(self, kind='cProfile'):
+        self.kind = kind
+        if kind == 'pyinstrument':
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode='disabled')
+        else:
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, label='rerun'):
+        """
+        Stops profiling and writes the report. Returns a dict with the text
+        summary, the path and contents of the downloadable file and its MIME
+        type.
+        """
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            text = self._profiler.output_text(unicode=True)
+            data = self._profiler.output_html().encode('utf-8')
+            path, mime = base + '.html', 'text/html'
+            with open(path, 'wb') as f:
+                f.write(data)
+        else:
+            self._profiler.disable()
+            path, mime = base + '.prof', 'application/octet-stream'
+            self._profiler.dump_stats(path)  # Open with `python -m pstats` or snakeviz
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+            text = out.getvalue()
+            with open(path, 'rb') as f:
+                data = f.read()
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(text)
+        return {'kind': self.kind, 'text': text, 'path': path, 'data': data, 'mime': mime}
+
+
+# Stage timings of the dashboard, shared by every session of this process
+app_timings = StageTimings()
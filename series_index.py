@@ -0,0 +1,54 @@
+# series_index.py
+import pandas as pd
+
+
+class SeriesIndex:
+    """
+    Read-only lookup structure over a price frame, built once per data load.
+    Holds each (City, FuelType) series as a date-indexed price Series plus a
+    latest-price table, so per-selection work is a dict lookup and a slice
+    instead of a boolean-mask scan of the whole frame.
+    """
+
+    def __init__(self, df):
+        self.cities = []
+        self.fuel_types = []
+        self._series = {}
+        self._latest = {}
+        if df.empty:
+            return
+
+        # Keep first-seen order for the selectboxes, as df.unique() did
+        self.cities = pd.unique(df['City']).tolist()
+        self.fuel_types = pd.unique(df['FuelType']).tolist()
+
+        for (city, fuel_type), group in df.groupby(['City', 'FuelType'], observed=True, sort=False):
+            prices = group.set_index('Date')['Price'].sort_index(kind='stable')
+            self._series[(city, fuel_type)] = prices
+            self._latest[(city, fuel_type)] = (prices.iloc[-1], prices.index[-1])
+
+    @property
+    def empty(self):
+        return not self._series
+
+    def keys(self):
+        """
+        Returns every (city, fuel_type) pair that has data.
+        """
+        return list(self._series)
+
+    def series(self, city, fuel_type, tail=None):
+        """
+        Returns the date-indexed price Series for one city and fuel type
+        (the last `tail` points only, if given), or an empty Series.
+        """
+        prices = self._series.get((city, fuel_type))
+        if prices is None:
+            return pd.Series(dtype='float64', name='Price')
+        return prices if tail is None else prices.iloc[-tail:]
+
+    def latest(self, city, fuel_type):
+        """
+        Returns (price, date) of the most recent observation, or None.
+        """
+        return self._latest.get((city, fuel_type))
@@ -0,0 +1,298 @@
+# snapshot.py
+"""
+Precomputed dashboard snapshot, written by the daily job next to the raw data.
+
+    python snapshot.py [--storage csv|sqlite|parquet] [--output FILE]
+
+Holds the latest price, trend verdict and chart series of every
+(City, FuelType) series in one file: magic, header length (uint32), JSON
+header, then 8-byte aligned float64 / datetime64[D] arrays that Snapshot
+reads in place from a memory map. The app only uses a snapshot whose
+fingerprint matches the current data.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from chart_data import CHART_RANGES, HISTORY_DAYS, POINT_BUDGET, ChartData
+from data_cache import DataCache
+from series_index import SeriesIndex
+from storage import FUEL_STORAGE, CsvStore, get_store
+from trends import SERIES_KEYS, TREND_COLUMNS, TREND_DAYS, compute_trends
+
+# Written by the daily job and committed with the data; override with FUEL_SNAPSHOT_FILE
+SNAPSHOT_FILE = os.environ.get('FUEL_SNAPSHOT_FILE', 'fuel_snapshot.bin')
+SNAPSHOT_MAGIC = b'FUELSNP1'  # Bump the digit when the layout changes; older files are then ignored
+FINGERPRINT_BYTES = 4096      # Tail of the CSV hashed into the fingerprint
+
+
+def data_fingerprint(store):
+    """
+    Identifies the data currently in the store. For the append-only CSV it is
+    the file size plus a hash of its last FINGERPRINT_BYTES, which survives a
+    git checkout (unlike mtimes) and changes with every append. Other
+    backends use their version token. None when there is no data.
+    """
+    if isinstance(store, CsvStore):
+        try:
+            with open(store.path, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - FINGERPRINT_BYTES))
+                tail = f.read()
+        except OSError:
+            return None
+        return f'csv:{size}:{hashlib.sha1(tail).hexdigest()}'
+    version = store.version()
+    return f'{type(store).__name__}:{version}' if version else None
+
+
+# --- Writing ---
+
+class _Arrays:
+    """
+    Collects the arrays of the data section, each padded to 8 bytes.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, values, dtype):
+        data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+        offset = self.size
+        padding = -len(data) % 8
+        self.chunks.append(data + b'\0' * padding)
+        self.size += len(data) + padding
+        return offset
+
+
+def _dates(index):
+    return index.values.astype('datetime64[D]')
+
+
+def _index(dates):
+    return pd.DatetimeIndex(dates.astype('datetime64[ns]'), name='Date')
+
+
+def _value(value):
+    """
+    Makes one trend table cell JSON-safe: dates as ISO strings, NaN as None.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def build_snapshot(df, fingerprint, chart_days=tuple(CHART_RANGES.values()), trend_days=TREND_DAYS, points=POINT_BUDGET):
+    """
+    Builds the snapshot bytes for a price frame (as loaded by DataCache), with
+    the same SeriesIndex, ChartData and compute_trends results the dashboard
+    would compute from it.
+    """
+    index = SeriesIndex(df)
+    charts = ChartData(index)
+    trends = compute_trends(df, days=trend_days)
+    arrays = _Arrays()
+
+    series = []
+    for city, fuel_type in index.keys():
+        price, date = index.latest(city, fuel_type)
+        entry = {
+            'city': city,
+            'fuel_type': fuel_type,
+            'latest_price': float(price),
+            'latest_date': date.strftime('%Y-%m-%d'),
+            'trend': {column: _value(value) for column, value in trends.loc[(city, fuel_type)].items()},
+            'charts': {},
+        }
+        for days in chart_days:
+            prices = charts.series(city, fuel_type, days=days, points=points)
+            entry['charts'][str(days)] = {
+                'dates': arrays.add(_dates(prices.index), 'datetime64[D]'),
+                'prices': arrays.add(prices.to_numpy(), '<f8'),
+                'length': len(prices),
+            }
+        series.append(entry)
+
+    compare = []
+    for fuel_type in index.fuel_types:
+        for days in chart_days:
+            frame = charts.compare(fuel_type, days=days, points=points)
+            if frame.empty:
+                continue
+            compare.append({
+                'fuel_type': fuel_type,
+                'days': days,
+                'cities': list(frame.columns),
+                'dates': arrays.add(_dates(frame.index), 'datetime64[D]'),
+                'prices': arrays.add(frame.to_numpy(), '<f8'),  # Row-major: one row per date
+                'length': len(frame),
+            })
+
+    header = json.dumps({
+        'built': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'fingerprint': fingerprint,
+        'chart_days': list(chart_days),
+        'trend_days': trend_days,
+        'points': points,
+        'cities': index.cities,
+        'fuel_types': index.fuel_types,
+        'series': series,
+        'compare': compare,
+    }).encode('utf-8')
+    header += b' ' * (-(len(SNAPSHOT_MAGIC) + 4 + len(header)) % 8)  # Align the data section
+    return SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header + b''.join(arrays.chunks)
+
+
+def write_snapshot(store, path=SNAPSHOT_FILE, history_days=HISTORY_DAYS):
+    """
+    Builds the snapshot for the store's current data and writes it atomically.
+    Returns the number of series in it.
+    """
+    fingerprint = data_fingerprint(store)
+    _, df = DataCache(store, history_days).refresh()
+    data = build_snapshot(df, fingerprint)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return df.groupby(SERIES_KEYS, observed=True).ngroups if not df.empty else 0
+
+
+# --- Reading ---
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file, with the lookups the dashboard makes on
+    SeriesIndex, ChartData and the trend table. Chart arrays are read straight
+    from the mapping when requested; only the header is parsed on open.
+    Chart lookups are limited to the ranges the snapshot was built for.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a fuel price snapshot of this version")
+        start = len(SNAPSHOT_MAGIC) + 4
+        (header_length,) = struct.unpack_from('<I', self._map, len(SNAPSHOT_MAGIC))
+        self.header = json.loads(self._map[start:start + header_length])
+        self._data_start = start + header_length
+
+        self.fingerprint = self.header['fingerprint']
+        self.cities = self.header['cities']
+        self.fuel_types = self.header['fuel_types']
+        self._series = {(entry['city'], entry['fuel_type']): entry for entry in self.header['series']}
+        self._compare = {(entry['fuel_type'], entry['days']): entry for entry in self.header['compare']}
+
+    @property
+    def empty(self):
+        return not self._series
+
+    def matches(self):
+        """
+        Whether the snapshot was built with the current CHART_RANGES, TREND_DAYS
+        and POINT_BUDGET; one written by an older revision may not be.
+        """
+        return (sorted(self.header['chart_days']) == sorted(CHART_RANGES.values())
+                and self.header['trend_days'] == TREND_DAYS and self.header['points'] == POINT_BUDGET)
+
+    def _array(self, offset, dtype, count):
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data_start + offset)
+
+    def keys(self):
+        return list(self._series)
+
+    def latest(self, city, fuel_type):
+        """
+        Returns (price, date) of the most recent observation, or None.
+        """
+        entry = self._series.get((city, fuel_type))
+        if entry is None:
+            return None
+        return entry['latest_price'], pd.Timestamp(entry['latest_date'])
+
+    def series(self, city, fuel_type, days):
+        """
+        Returns the chart series of one city and fuel type over the last
+        `days` calendar days, as ChartData.series() built it, or an empty Series.
+        """
+        entry = self._series.get((city, fuel_type))
+        if entry is None:
+            return pd.Series(dtype='float64', name='Price')
+        chart = entry['charts'][str(days)]
+        dates = self._array(chart['dates'], 'datetime64[D]', chart['length'])
+        return pd.Series(self._array(chart['prices'], '<f8', chart['length']),
+                         index=_index(dates), name='Price')
+
+    def compare(self, fuel_type, days):
+        """
+        Returns the Date x City comparison frame of one fuel type, as
+        ChartData.compare() built it, or an empty frame.
+        """
+        entry = self._compare.get((fuel_type, days))
+        if entry is None:
+            return pd.DataFrame()
+        dates = self._array(entry['dates'], 'datetime64[D]', entry['length'])
+        prices = self._array(entry['prices'], '<f8', entry['length'] * len(entry['cities']))
+        return pd.DataFrame(prices.reshape(entry['length'], len(entry['cities'])),
+                            index=_index(dates), columns=entry['cities'])
+
+    @cached_property
+    def trends(self):
+        """
+        The trend table, indexed by (City, FuelType) like compute_trends().
+        """
+        records = [dict(entry['trend'], City=city, FuelType=fuel_type)
+                   for (city, fuel_type), entry in self._series.items()]
+        table = pd.DataFrame(records, columns=SERIES_KEYS + TREND_COLUMNS).set_index(SERIES_KEYS)
+        for column in ('start_date', 'end_date'):
+            table[column] = pd.to_datetime(table[column])
+        return table.astype({'avg_daily_change': 'float64', 'volatility': 'float64'})
+
+    def close(self):
+        self._map.close()
+
+
+def open_snapshot(fingerprint, path=SNAPSHOT_FILE):
+    """
+    Returns the Snapshot at `path` if it was built from the data with this
+    fingerprint (see data_fingerprint()), else None (missing, unreadable or stale).
+    """
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    if snapshot.fingerprint is None or snapshot.fingerprint != fingerprint:
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the dashboard snapshot for the current price data.")
+    parser.add_argument('--storage', choices=['csv', 'sqlite', 'parquet'], default=FUEL_STORAGE,
+                        help="Storage backend (default: the FUEL_STORAGE environment variable, else csv)")
+    parser.add_argument('--output', default=SNAPSHOT_FILE, help=f"Snapshot file (default: {SNAPSHOT_FILE})")
+    args = parser.parse_args()
+
+    count = write_snapshot(get_store(args.storage), args.output)
+    print(f"Wrote snapshot of {count} series to {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# source_health.py
+import json
+import os
+import time
+
+from metrics import percentile
+
+# Where latency / success history is kept between runs; override with FUEL_SOURCE_HEALTH_FILE
+SOURCE_HEALTH_FILE = os.environ.get('FUEL_SOURCE_HEALTH_FILE', '.source_health.json')
+
+EWMA_ALPHA = 0.3              # Weight of the newest observation in the running averages
+LATENCY_SAMPLES = 50          # Recent successful latencies kept per source for the p95
+DEFAULT_LATENCY_MS = 3000     # Assumed latency of a source we have no history for
+MIN_SUCCESS_RATE = 0.05       # Floor so one bad streak doesn't make a source look infinitely slow
+HEDGE_MIN_DELAY = 0.5         # Seconds; never hedge sooner than this
+FAILURES_TO_OPEN = 5          # Consecutive failed calls (transport errors, 5xx, 429) that open a source's circuit
+OPEN_SECONDS = 6 * 3600       # How long an open circuit stays open before a trial call
+
+
+class SourceHealth:
+    """
+    Latency and success history per source, persisted between runs.
+
+    Used to order sources by expected time to a valid price, to skip sources
+    whose circuit breaker is open, and to pick the p95-based delay after which
+    the next source is tried in parallel (a hedged request).
+    """
+
+    def __init__(self, path=SOURCE_HEALTH_FILE):
+        self.path = path
+        self.sources = {}
+        try:
+            with open(path, 'r') as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _stats(self, source):
+        return self.sources.setdefault(source, {
+            'latency_ms': None,
+            'success_rate': 1.0,
+            'latencies': [],
+            'consecutive_failures': 0,
+            'open_until': 0,
+        })
+
+    def record(self, source, latency_ms, success, failed=False):
+        """
+        Folds one scraper call into the source's history and trips or resets its
+        circuit. `success` means a valid price came back; `failed` means the
+        source itself failed (see is_source_failure()). A call that got an
+        answer but no price - a city or fuel the source doesn't publish, a price
+        held back by validation - only lowers the success rate.
+        """
+        stats = self._stats(source)
+        stats['success_rate'] = (1 - EWMA_ALPHA) * stats['success_rate'] + EWMA_ALPHA * (1.0 if success else 0.0)
+        if success:
+            previous = stats['latency_ms']
+            stats['latency_ms'] = latency_ms if previous is None else (1 - EWMA_ALPHA) * previous + EWMA_ALPHA * latency_ms
+            stats['latencies'] = (stats['latencies'] + [latency_ms])[-LATENCY_SAMPLES:]
+        if failed:
+            stats['consecutive_failures'] += 1
+            if stats['consecutive_failures'] >= FAILURES_TO_OPEN:
+                stats['open_until'] = time.time() + OPEN_SECONDS
+        else:
+            stats['consecutive_failures'] = 0
+            stats['open_until'] = 0
+
+    def record_calls(self, calls):
+        """
+        Records every scraper call from a metrics.RunMetrics run. The politeness
+        wait is our own doing, so it is left out of the source's latency.
+        """
+        for call in calls:
+            latency_ms = call['total_ms'] - (call.get('wait_ms') or 0)
+            self.record(call['source'], latency_ms, call['price'] is not None, is_source_failure(call))
+
+    def is_open(self, source):
+        """
+        True while the source's circuit is open. Once the open period is over
+        the source gets calls again; one more failure re-opens it straight away
+        because the consecutive failure count is kept.
+        """
+        return self.sources.get(source, {}).get('open_until', 0) > time.time()
+
+    def expected_ms(self, source):
+        """
+        Expected time to a valid price: average latency divided by success rate.
+        """
+        stats = self.sources.get(source)
+        if not stats or stats['latency_ms'] is None:
+            return DEFAULT_LATENCY_MS
+        return stats['latency_ms'] / max(stats['success_rate'], MIN_SUCCESS_RATE)
+
+    def hedge_delay(self, source):
+        """
+        Seconds to wait for `source` before also asking the next source: the p95
+        of its recent successful latencies.
+        """
+        latencies = sorted(self.sources.get(source, {}).get('latencies', []))
+        p95 = percentile(latencies, 95) if latencies else DEFAULT_LATENCY_MS
+        return max(HEDGE_MIN_DELAY, p95 / 1000)
+
+    def order(self, source_names):
+        """
+        Returns the sources with closed circuits, fastest expected first. Ties
+        (e.g. no history yet) keep the given order. If every circuit is open,
+        all sources are returned so a run is never left without one.
+        """
+        available = [name for name in source_names if not self.is_open(name)] or list(source_names)
+        return sorted(available, key=self.expected_ms)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.sources, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def is_source_failure(call):
+    """
+    Whether a scraper call failed because of the source: a transport error
+    (no HTTP status) or a 5xx / 429 response. A 404 for a page the source
+    doesn't have is not a failure of the source.
+    """
+    status = call.get('status')
+    if status is None:
+        return call['error'] is not None
+    return status == 429 or status >= 500
@@ -0,0 +1,119 @@
+# sources.py
+import json
+import os
+import re
+from collections import namedtuple
+
+from city_registry import city_slug
+
+# Extra source specs as a JSON list of objects with the SourceSpec fields;
+# a spec with the same name as a built-in one replaces it
+FUEL_SOURCES_FILE = os.environ.get('FUEL_SOURCES_FILE')
+
+# A price source, described as data:
+#   name         - short name used in logs, metrics and source health
+#   url          - URL template; {fuel} is the lower-cased fuel type, {slug} the city's slug for this source
+#   fuel_types   - fuel types the source publishes
+#   patterns     - regexes tried in order, each capturing the price as group 1;
+#                  {city} is the city name as the page writes it, {fuel} the fuel type,
+#                  {unit} any of the units a price is quoted in
+#   xpaths       - optional price containers; only their text is searched when one matches
+#   price_ranges - optional per-fuel (low, high) bounds overriding price_extractor.PRICE_RANGES
+#   render       - the price may only appear after client-side rendering; the page is
+#                  retried in a headless browser when the static HTML has no price
+#                  (opt-in, see browser_pool.py)
+SourceSpec = namedtuple('SourceSpec', ['name', 'url', 'fuel_types', 'patterns', 'xpaths', 'price_ranges', 'render'],
+                        defaults=((), None, False))
+
+# Units a price can be quoted in on the source pages
+UNIT = r'per\s*(?:litre|kg|cylinder)'
+
+# Built-in sources, in order of preference
+SOURCES = [
+    # Based on search results, this seems most reliable
+    SourceSpec(
+        name='cardekho',
+        url='https://www.cardekho.com/{fuel}-price-in-{slug}',
+        fuel_types=('Petrol', 'Diesel', 'CNG'),
+        patterns=(
+            r'Today.{0,20}s {fuel} price in {city} stands at ₹\s*(\d+\.?\d*)\s*{unit}',
+            r'{fuel} price in {city} stands at ₹\s*(\d+\.?\d*)',
+            r'₹\s*(\d+\.?\d*)\s*{unit}.{0,60}?{fuel}',
+        ),
+    ),
+    SourceSpec(
+        name='goodreturns',
+        url='https://www.goodreturns.in/{fuel}-price-in-{slug}.html',
+        fuel_types=('Petrol', 'Diesel', 'CNG', 'LPG'),
+        patterns=(
+            r'Rs\.\s*([\d,]+\.?\d*)\s*/\s*(?:Ltr|Kg|Cylinder)',
+            r'₹\s*([\d,]+\.?\d*)\s*{unit}',
+            r'Today.{0,80}?{city}.{0,80}?₹\s*([\d,]+\.?\d*)',
+            r'{city} {fuel} Price.{0,80}?Rs\.\s*([\d,]+\.?\d*)',
+        ),
+    ),
+    # Patterns based on search results showing "87.67,/ per litre"
+    SourceSpec(
+        name='acko',
+        url='https://www.acko.com/fuel/{fuel}-price-in-{slug}/',
+        fuel_types=('Petrol', 'Diesel', 'CNG'),
+        patterns=(
+            r'(\d+\.?\d*),/\s*{unit}',
+            r'₹\s*(\d+\.?\d*)\s*{unit}',
+            r'Today.{0,80}?(\d+\.?\d*)\s*{unit}',
+            r'{fuel} Price.{0,40}?(\d+\.?\d*)',
+        ),
+        render=True,
+    ),
+    SourceSpec(
+        name='businesstoday',
+        url='https://www.businesstoday.in/fuel-price/{fuel}-price-in-{slug}-today',
+        fuel_types=('Petrol',),
+        patterns=(
+            r'₹(\d+\.?\d*)\s*{unit}',
+            r'stood at ₹(\d+\.?\d*)',
+            r'price.{0,80}?{city}.{0,80}?₹(\d+\.?\d*)',
+        ),
+        render=True,
+    ),
+]
+
+
+def source_url(spec, city, fuel_type):
+    """
+    Fills in the spec's URL template for a city and fuel type.
+    """
+    return spec.url.format(fuel=fuel_type.lower(), slug=city_slug(city, spec.name))
+
+
+def source_patterns(spec, city, fuel_type):
+    """
+    Fills in the spec's pattern templates for a city and fuel type.
+    Plain replacement rather than str.format, so regex quantifiers like {0,20} stay intact.
+    """
+    replacements = {'{city}': re.escape(city.match), '{fuel}': re.escape(fuel_type), '{unit}': UNIT}
+    patterns = []
+    for pattern in spec.patterns:
+        for token, value in replacements.items():
+            pattern = pattern.replace(token, value)
+        patterns.append(pattern)
+    return patterns
+
+
+def load_sources(path=FUEL_SOURCES_FILE):
+    """
+    Returns the built-in SOURCES merged with any specs from the JSON file at `path`.
+    """
+    specs = {spec.name: spec for spec in SOURCES}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for raw in json.load(f):
+                spec = SourceSpec(**raw)
+                specs[spec.name] = spec._replace(
+                    fuel_types=tuple(spec.fuel_types),
+                    patterns=tuple(spec.patterns),
+                    xpaths=tuple(spec.xpaths),
+                    price_ranges={fuel: tuple(bounds) for fuel, bounds in spec.price_ranges.items()}
+                    if spec.price_ranges else None,
+                )
+    return list(specs.values())
@@ -0,0 +1,370 @@
+# storage.py
+import argparse
+import csv
+import io
+import os
+import sqlite3
+from urllib.parse import quote, unquote
+
+# pandas is imported inside the functions that need it: the daily fetch only
+# appends rows, and skipping the import is a large share of its startup time
+
+# Default locations; FUEL_STORAGE selects the backend ('csv', 'sqlite' or 'parquet')
+FUEL_DATA_FILE = 'fuel_prices.csv'
+FUEL_DB_FILE = 'fuel_prices.db'
+FUEL_PARQUET_DIR = 'fuel_prices_parquet'
+FUEL_STORAGE = os.environ.get('FUEL_STORAGE', 'csv')
+
+COLUMNS = ['Date', 'City', 'FuelType', 'Price']
+KEY_COLUMNS = ['Date', 'City', 'FuelType']
+
+
+def empty_frame():
+    import pandas as pd
+    df = pd.DataFrame(columns=COLUMNS)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def normalize(df):
+    """
+    Parses dates, drops superseded rows, sorts by date and stores City and
+    FuelType as categoricals (a handful of distinct values repeated on every row).
+    When a (Date, City, FuelType) key appears more than once, the row written
+    last wins, which is what gives the append-only CSV its upsert semantics.
+    """
+    import pandas as pd
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+    df = df.sort_values('Date', kind='stable').reset_index(drop=True)
+    return df.astype({'City': 'category', 'FuelType': 'category'})
+
+
+def file_version(*paths):
+    """
+    Cheap change token for a set of files: (mtime_ns, size) of each one that
+    exists. Any write to the files changes it.
+    """
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def filter_frame(df, city=None, fuel_type=None, start=None, end=None):
+    """
+    Applies the optional load() filters to an in-memory frame.
+    """
+    import pandas as pd
+    mask = pd.Series(True, index=df.index)
+    if city is not None:
+        mask &= df['City'] == city
+    if fuel_type is not None:
+        mask &= df['FuelType'] == fuel_type
+    if start is not None:
+        mask &= df['Date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['Date'] <= pd.Timestamp(end)
+    return df[mask].reset_index(drop=True) if not mask.all() else df
+
+
+class CsvStore:
+    """
+    Append-only CSV storage. upsert() appends rows to the end of the file;
+    readers keep the last row written for a key (see normalize()).
+    """
+
+    def __init__(self, path=FUEL_DATA_FILE):
+        self.path = path
+
+    def upsert(self, rows):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a+', newline='', encoding='utf-8') as f:
+            if not new_file:
+                # Don't glue the first new row onto a last line without a newline
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+            writer = csv.DictWriter(f, fieldnames=COLUMNS, lineterminator='\n')
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
+
+    def load(self, city=None, fuel_type=None, start=None, end=None):
+        import pandas as pd
+        if not os.path.exists(self.path):
+            return empty_frame()
+        try:
+            df = pd.read_csv(self.path, dtype={'City': 'category', 'FuelType': 'category'})
+        except pd.errors.EmptyDataError:
+            return empty_frame()
+        if df.empty:
+            return empty_frame()
+        return filter_frame(normalize(df), city, fuel_type, start, end)
+
+    def rows(self):
+        """
+        Returns every current row as a dict, oldest first, without pandas
+        (for callers on the slim fetch path). Later rows win, as in load().
+        """
+        if not os.path.exists(self.path):
+            return []
+        latest = {}
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('Price'):
+                    row['Price'] = float(row['Price'])
+                    latest[(row['Date'], row['City'], row['FuelType'])] = row
+        return sorted(latest.values(), key=lambda row: row['Date'])
+
+    def version(self):
+        return file_version(self.path)
+
+    def read_from(self, offset):
+        """
+        Parses only the rows written after byte `offset` (0 reads the whole
+        file, header included). Returns (raw rows, new offset); the rows are
+        not normalized. After offset 0, a last line without its newline is
+        still being written and is left for the next call. This is what lets
+        readers pick up the daily append without reparsing the history.
+        """
+        import pandas as pd
+        if not os.path.exists(self.path):
+            return empty_frame(), 0
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        if offset > 0:
+            data = data[:data.rfind(b'\n') + 1]
+        if not data.strip():
+            return empty_frame(), offset
+        df = pd.read_csv(io.BytesIO(data), header=0 if offset == 0 else None,
+                         names=None if offset == 0 else COLUMNS)
+        return df, offset + len(data)
+
+    def compact(self):
+        """
+        Rewrites the file without superseded rows. Occasional maintenance only;
+        the daily path never rewrites the file.
+        """
+        df = self.load()
+        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+        df.to_csv(self.path, index=False)
+        return len(df)
+
+
+class SqliteStore:
+    """
+    SQLite storage with a primary key on (Date, City, FuelType), so upserts are
+    indexed single-row writes instead of a rewrite of the whole history.
+    """
+
+    def __init__(self, path=FUEL_DB_FILE):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS prices (
+                date TEXT NOT NULL,
+                city TEXT NOT NULL,
+                fuel_type TEXT NOT NULL,
+                price REAL NOT NULL,
+                PRIMARY KEY (date, city, fuel_type)
+            )
+        """)
+        return conn
+
+    def upsert(self, rows):
+        with self.connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO prices (date, city, fuel_type, price)
+                VALUES (:Date, :City, :FuelType, :Price)
+                ON CONFLICT (date, city, fuel_type) DO UPDATE SET price = excluded.price
+                """,
+                rows,
+            )
+        conn.close()
+        return len(rows)
+
+    def load(self, city=None, fuel_type=None, start=None, end=None):
+        import pandas as pd
+        if not os.path.exists(self.path):
+            return empty_frame()
+        clauses, params = [], []
+        for clause, value in (('city = ?', city), ('fuel_type = ?', fuel_type),
+                              ('date >= ?', start), ('date <= ?', end)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(pd.Timestamp(value).strftime('%Y-%m-%d') if 'date' in clause else value)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+        conn = self.connect()
+        try:
+            df = pd.read_sql_query(
+                "SELECT date AS Date, city AS City, fuel_type AS FuelType, price AS Price "
+                f"FROM prices {where}ORDER BY date",
+                conn,
+                params=params,
+            )
+        finally:
+            conn.close()
+        if df.empty:
+            return empty_frame()
+        return normalize(df)
+
+    def rows(self):
+        """
+        Returns every row as a dict, oldest first, without pandas.
+        """
+        if not os.path.exists(self.path):
+            return []
+        conn = self.connect()
+        try:
+            cursor = conn.execute("SELECT date, city, fuel_type, price FROM prices ORDER BY date")
+            return [dict(zip(COLUMNS, row)) for row in cursor]
+        finally:
+            conn.close()
+
+    def version(self):
+        # Committed writes may still sit in the write-ahead log
+        return file_version(self.path, self.path + '-wal')
+
+
+class ParquetStore:
+    """
+    Parquet storage partitioned by city and month:
+
+        fuel_prices_parquet/<city>/<YYYY-MM>.parquet
+
+    load() only opens the partitions that can match its city and date filters;
+    upsert() rewrites just the (small) partitions that received new rows.
+    Requires pyarrow.
+    """
+
+    def __init__(self, path=FUEL_PARQUET_DIR):
+        self.path = path
+
+    def _partition(self, city, month):
+        return os.path.join(self.path, quote(city, safe=''), f'{month}.parquet')
+
+    def upsert(self, rows):
+        import pandas as pd
+        new_data = pd.DataFrame(rows, columns=COLUMNS)
+        new_data['Date'] = pd.to_datetime(new_data['Date'])
+        months = new_data['Date'].dt.strftime('%Y-%m')
+        for (city, month), part in new_data.groupby([new_data['City'], months]):
+            path = self._partition(city, month)
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+                part = part.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            part.sort_values('Date').to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        return len(rows)
+
+    def load(self, city=None, fuel_type=None, start=None, end=None):
+        import pandas as pd
+        if not os.path.isdir(self.path):
+            return empty_frame()
+        first_month = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        last_month = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+
+        frames = []
+        for city_dir in sorted(os.listdir(self.path)):
+            if city is not None and unquote(city_dir) != city:
+                continue
+            for filename in sorted(os.listdir(os.path.join(self.path, city_dir))):
+                if not filename.endswith('.parquet'):
+                    continue
+                month = filename[:-len('.parquet')]
+                if (first_month and month < first_month) or (last_month and month > last_month):
+                    continue
+                frames.append(pd.read_parquet(os.path.join(self.path, city_dir, filename), columns=COLUMNS))
+        if not frames:
+            return empty_frame()
+        df = pd.concat(frames, ignore_index=True)
+        return filter_frame(normalize(df), None, fuel_type, start, end)
+
+    def rows(self):
+        """
+        Returns every row as a dict, oldest first (Parquet needs pandas anyway).
+        """
+        df = self.load()
+        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+        return df.astype({'City': str, 'FuelType': str}).to_dict('records')
+
+    def version(self):
+        if not os.path.isdir(self.path):
+            return ()
+        return file_version(*sorted(
+            os.path.join(self.path, city_dir, filename)
+            for city_dir in os.listdir(self.path)
+            for filename in os.listdir(os.path.join(self.path, city_dir))
+            if filename.endswith('.parquet')
+        ))
+
+
+def get_store(backend=None):
+    """
+    Returns the configured storage backend (FUEL_STORAGE by default).
+    """
+    backend = backend or FUEL_STORAGE
+    if backend == 'csv':
+        return CsvStore()
+    if backend == 'sqlite':
+        return SqliteStore()
+    if backend == 'parquet':
+        return ParquetStore()
+    raise ValueError(f"Unknown storage backend '{backend}'. Use 'csv', 'sqlite' or 'parquet'.")
+
+
+def copy_store(source, target):
+    """
+    Copies every row from one store into another. Safe to re-run: existing keys
+    are updated in place and repeated source rows collapse to the last one.
+    """
+    df = source.load()
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    return target.upsert(df.astype({'City': str, 'FuelType': str}).to_dict('records'))
+
+
+def migrate_csv_to_sqlite(csv_path=FUEL_DATA_FILE, db_path=FUEL_DB_FILE):
+    """
+    Copies the CSV history into the SQLite store.
+    """
+    return copy_store(CsvStore(csv_path), SqliteStore(db_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the fuel price store.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate = subparsers.add_parser('migrate', help="Copy the CSV history into the SQLite store")
+    migrate.add_argument('--csv', default=FUEL_DATA_FILE)
+    migrate.add_argument('--db', default=FUEL_DB_FILE)
+    export = subparsers.add_parser('export-parquet', help="Copy the CSV history into the Parquet store")
+    export.add_argument('--csv', default=FUEL_DATA_FILE)
+    export.add_argument('--dir', default=FUEL_PARQUET_DIR)
+    compact = subparsers.add_parser('compact', help="Drop superseded rows from the CSV file")
+    compact.add_argument('--csv', default=FUEL_DATA_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        count = migrate_csv_to_sqlite(args.csv, args.db)
+        print(f"Migrated {count} rows from {args.csv} to {args.db}")
+    elif args.command == 'export-parquet':
+        count = copy_store(CsvStore(args.csv), ParquetStore(args.dir))
+        print(f"Exported {count} rows from {args.csv} to {args.dir}")
+    elif args.command == 'compact':
+        count = CsvStore(args.csv).compact()
+        print(f"Compacted {args.csv} to {count} rows")
+
+
+if __name__ == '__main__':
+    main()
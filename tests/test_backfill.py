@@ -0,0 +1,25 @@
+# tests/test_backfill.py
+import pandas as pd
+
+from backfill import Checkpoint, file_units, run_backfill
+from storage import CsvStore
+
+
+def write_csv(path, fuel_type, prices):
+    pd.DataFrame({'Date': list(prices), 'City': 'New Delhi', 'FuelType': fuel_type,
+                  'Price': list(prices.values())}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_batches_are_validated_across_units(tmp_path):
+    # Each file is valid on its own; only together do they show petrol = diesel on one day
+    paths = [write_csv(tmp_path / 'petrol.csv', 'Petrol', {'2021-01-01': 103.5, '2021-01-02': 94.7}),
+             write_csv(tmp_path / 'diesel.csv', 'Diesel', {'2021-01-01': 103.5, '2021-01-02': 87.6})]
+    store = CsvStore(str(tmp_path / 'prices.csv'))
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    units = file_units(paths, {})
+
+    assert run_backfill(units, store, checkpoint, workers=2) == 2
+    assert sorted(store.load()['Price'].tolist()) == [87.6, 94.7]
+    assert checkpoint.done == {unit_id for unit_id, _, _ in units}
+    assert run_backfill(units, store, Checkpoint(checkpoint.path), workers=2) == 0  # Resumed: nothing left to run
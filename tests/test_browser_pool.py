@@ -0,0 +1,141 @@
+# tests/test_browser_pool.py
+import threading
+import time
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, fail_get=False, dead=False):
+        self.fail_get = fail_get or dead
+        self.dead = dead
+        self.page_source = '<html>₹ 95.00</html>'
+        self.quit_called = False
+        self.text_after = 0  # innerText polls before the price shows up
+
+    def find_elements(self, by, xpath):
+        return []
+
+    def execute_script(self, script):
+        self.text_after -= 1
+        return 'Petrol ₹ 95.00 per litre' if self.text_after < 0 else 'Loading…'
+
+    def get(self, url):
+        time.sleep(0.05)
+        if self.fail_get:
+            raise TimeoutError("page load timed out")
+
+    @property
+    def title(self):
+        if self.dead:
+            raise RuntimeError("invalid session id")
+        return 'Fuel prices'
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePool(BrowserPool):
+    """
+    BrowserPool whose launches hand out prepared outcomes in order: a
+    FakeDriver, or an exception to raise.
+    """
+
+    def __init__(self, size, outcomes):
+        super().__init__(size)
+        self.outcomes = list(outcomes)
+        self.launches = 0
+        self._outcomes_lock = threading.Lock()
+
+    def _launch(self):
+        time.sleep(0.05)
+        with self._outcomes_lock:
+            self.launches += 1
+            outcome = self.outcomes.pop(0) if self.outcomes else FakeDriver()
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def render_concurrently(pool, callers):
+    results = [None] * callers
+    start = threading.Barrier(callers)
+
+    def call(i):
+        start.wait()
+        try:
+            results[i] = pool.render(f'https://render.test/page{i}')
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,), daemon=True) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads), "a caller is still blocked"
+    return results
+
+
+@pytest.mark.parametrize('outcomes', [
+    [RuntimeError("chrome failed to start"), RuntimeError("chrome failed to start")],
+    [FakeDriver(dead=True), FakeDriver(dead=True)],
+], ids=['launch-fails', 'session-dies'])
+def test_waiter_launches_replacement_when_slots_free(outcomes):
+    pool = FakePool(2, outcomes)
+    results = render_concurrently(pool, 3)
+    failures = [result for result in results if isinstance(result, Exception)]
+    assert len(failures) == 2
+    assert '<html>₹ 95.00</html>' in results
+    assert pool.launches == 3
+
+
+def test_failed_page_keeps_a_live_browser():
+    driver = FakeDriver(fail_get=True)
+    pool = FakePool(1, [driver])
+    with pytest.raises(TimeoutError):
+        pool.render('https://render.test/slow')
+    assert not driver.quit_called
+    assert pool._idle == [driver]
+    driver.fail_get = False
+    assert pool.render('https://render.test/page') == '<html>₹ 95.00</html>'
+    assert pool.launches == 1
+
+
+def test_render_waits_for_price_text(monkeypatch):
+    monkeypatch.setattr(browser_pool, 'RENDER_POLL', 0.01)
+    driver = FakeDriver()
+    driver.text_after = 3
+    pool = FakePool(1, [driver])
+    pool.render('https://render.test/page', patterns=[r'Petrol\s*₹\s*(\d+\.\d+)'])
+    assert driver.text_after == -1
+
+
+def test_render_returns_page_without_price_at_timeout(monkeypatch):
+    monkeypatch.setattr(browser_pool, 'RENDER_POLL', 0.01)
+    monkeypatch.setattr(browser_pool, 'RENDER_TIMEOUT', 0.1)
+    driver = FakeDriver()
+    driver.text_after = 1000
+    pool = FakePool(1, [driver])
+    assert pool.render('https://render.test/page', patterns=[r'Diesel']) == '<html>₹ 95.00</html>'
+    assert pool._idle == [driver]
+
+
+def test_browsers_are_reused_and_capped():
+    pool = FakePool(2, [])
+    results = render_concurrently(pool, 6)
+    assert all(result == '<html>₹ 95.00</html>' for result in results)
+    assert pool.launches == 2
+
+
+def test_acquire_times_out_when_no_browser_frees(monkeypatch):
+    monkeypatch.setattr(browser_pool, 'RENDER_TIMEOUT', 0.2)
+    pool = FakePool(1, [])
+    pool._acquire()  # Held and never released
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool._acquire()
+    assert time.monotonic() - start < 1
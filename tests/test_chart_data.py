@@ -0,0 +1,36 @@
+# tests/test_chart_data.py
+import numpy as np
+import pandas as pd
+
+from chart_data import downsample, lttb
+
+
+def test_lttb_keeps_endpoints_and_sorted_unique_indices():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    indices = lttb(x, y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[250] = 10.0
+    assert 250 in lttb(x, y, 20)
+
+
+def test_lttb_returns_everything_below_the_threshold():
+    x = np.arange(10, dtype=np.float64)
+    assert lttb(x, x, 50).tolist() == list(range(10))
+    assert lttb(x, x, 2).tolist() == list(range(10))
+
+
+def test_downsample_limits_a_date_series():
+    dates = pd.date_range('2020-01-01', periods=2000, freq='D')
+    prices = pd.Series(np.linspace(90, 110, 2000), index=dates, name='Price')
+    reduced = downsample(prices, 200)
+    assert len(reduced) == 200
+    assert reduced.index[0] == dates[0] and reduced.index[-1] == dates[-1]
+    assert len(downsample(prices.iloc[:150], 200)) == 150
@@ -0,0 +1,72 @@
+# tests/test_fetch_engine.py
+import threading
+import time
+
+from fetch_engine import gather_prices
+
+
+def returns(price, delay=0.0, started=None, name=None):
+    """
+    A stub task: records its start time in `started[name]`, sleeps, returns `price`.
+    """
+    def task():
+        if started is not None:
+            started[name] = time.monotonic()
+        time.sleep(delay)
+        return price
+    return task
+
+
+def test_preference_order_wins_over_arrival_order():
+    tasks = [
+        ('slow', 'Petrol', returns(100.0, delay=0.2)),
+        ('fast', 'Petrol', returns(101.0)),
+    ]
+    # quorum=2 waits for both; the earlier task in the list wins although it answered last
+    assert gather_prices(tasks, ['Petrol'], quorum=2) == {'Petrol': (100.0, 'slow')}
+
+
+def test_settled_keys_skip_queued_tasks():
+    ran = []
+    tasks = [('a', 'Petrol', returns(100.0))] + [
+        ('a', 'Petrol', lambda: ran.append(True) or 99.0) for _ in range(5)]
+    assert gather_prices(tasks, ['Petrol'], hedge_delays={'a': 10}) == {'Petrol': (100.0, 'a')}
+    assert not ran
+
+
+def test_hedged_task_starts_after_the_delay():
+    started = {}
+    begin = time.monotonic()
+    tasks = [
+        ('first', 'Petrol', returns(100.0, delay=0.6, started=started, name='first')),
+        ('second', 'Petrol', returns(101.0, started=started, name='second')),
+    ]
+    result = gather_prices(tasks, ['Petrol'], hedge_delays={'first': 0.2, 'second': 0.2})
+    assert result == {'Petrol': (101.0, 'second')}
+    assert 0.15 <= started['second'] - begin < 0.5
+
+
+def test_none_result_releases_the_next_source_at_once():
+    started = {}
+    tasks = [
+        ('first', 'Petrol', returns(None, delay=0.05, started=started, name='first')),
+        ('second', 'Petrol', returns(101.0, started=started, name='second')),
+    ]
+    result = gather_prices(tasks, ['Petrol'], hedge_delays={'first': 5.0, 'second': 5.0})
+    assert result == {'Petrol': (101.0, 'second')}
+    assert started['second'] - started['first'] < 1.0
+
+
+def test_deadline_returns_collected_prices_despite_a_stuck_task():
+    unblock = threading.Event()
+    tasks = [
+        ('stuck', 'Petrol', lambda: unblock.wait(5) and None),
+        ('ok', 'Diesel', returns(92.0)),
+    ]
+    start = time.monotonic()
+    try:
+        result = gather_prices(tasks, ['Petrol', 'Diesel'], deadline=0.3)
+    finally:
+        unblock.set()
+    assert result == {'Diesel': (92.0, 'ok')}
+    assert time.monotonic() - start < 1.0
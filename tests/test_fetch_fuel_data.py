@@ -0,0 +1,35 @@
+# tests/test_fetch_fuel_data.py
+from city_registry import get_city
+from fetch_fuel_data import FALLBACK_PRICES, SOURCES, build_tasks, resolve_city_rows
+
+CITY = get_city('New Delhi')
+
+
+def test_default_order_uses_every_source():
+    names = {name for name, _, _ in build_tasks([CITY], ['Petrol'])}
+    assert names == {spec.name for spec in SOURCES if 'Petrol' in spec.fuel_types}
+
+
+def test_empty_order_builds_no_tasks():
+    assert build_tasks([CITY], ['Petrol'], []) == []
+    assert build_tasks([CITY], ['Petrol'], [], render=True) == []
+
+
+def test_render_tasks_only_cover_render_sources_and_keys():
+    tasks = build_tasks([CITY], ['Petrol', 'Diesel'], [spec.name for spec in SOURCES],
+                        render=True, keys={('New Delhi', 'Diesel')})
+    assert tasks
+    assert all(key == ('New Delhi', 'Diesel') for _, key, _ in tasks)
+    assert {name for name, _, _ in tasks} <= {spec.name for spec in SOURCES if spec.render}
+
+
+def test_fallback_price_fills_a_missing_price():
+    rows = resolve_city_rows('New Delhi', ['Petrol', 'Diesel'], {('New Delhi', 'Petrol'): 95.0}, '2025-01-02')
+    assert {row['FuelType']: row['Price'] for row in rows} == {
+        'Petrol': 95.0, 'Diesel': FALLBACK_PRICES[('New Delhi', 'Diesel')]}
+
+
+def test_held_back_price_gets_no_fallback_row():
+    rows = resolve_city_rows('New Delhi', ['Petrol', 'Diesel'], {('New Delhi', 'Petrol'): 95.0}, '2025-01-02',
+                             held_back={('New Delhi', 'Diesel')})
+    assert [row['FuelType'] for row in rows] == ['Petrol']
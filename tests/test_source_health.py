@@ -0,0 +1,31 @@
+# tests/test_source_health.py
+from source_health import FAILURES_TO_OPEN, SourceHealth
+
+
+def call(source, status=200, error=None, price=None):
+    return {'source': source, 'status': status, 'error': error, 'price': price, 'total_ms': 100.0, 'wait_ms': 0.0}
+
+
+def test_missing_prices_do_not_open_the_circuit(tmp_path):
+    health = SourceHealth(str(tmp_path / 'health.json'))
+    health.record_calls([call('acko', status=404, error='HTTPError: 404') for _ in range(FAILURES_TO_OPEN)])
+    health.record_calls([call('acko') for _ in range(FAILURES_TO_OPEN)])  # Answered, but no price
+    assert not health.is_open('acko')
+    assert health.sources['acko']['success_rate'] < 0.5
+
+
+def test_transport_errors_and_5xx_open_the_circuit(tmp_path):
+    health = SourceHealth(str(tmp_path / 'health.json'))
+    calls = [call('acko', status=None, error='ConnectionError: refused'),
+             call('acko', status=503, error='HTTPError: 503'),
+             call('acko', status=429, error='HTTPError: 429')]
+    health.record_calls((calls * FAILURES_TO_OPEN)[:FAILURES_TO_OPEN])
+    assert health.is_open('acko')
+
+
+def test_an_answer_resets_the_failure_streak(tmp_path):
+    health = SourceHealth(str(tmp_path / 'health.json'))
+    failure = call('acko', status=None, error='Timeout: read timed out')
+    health.record_calls([failure] * (FAILURES_TO_OPEN - 1) + [call('acko', status=404, error='HTTPError: 404')] +
+                        [failure] * (FAILURES_TO_OPEN - 1))
+    assert not health.is_open('acko')
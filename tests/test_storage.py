@@ -0,0 +1,60 @@
+# tests/test_storage.py
+from data_cache import DataCache
+from storage import CsvStore
+
+
+def row(date, price, city='New Delhi', fuel_type='Petrol'):
+    return {'Date': date, 'City': city, 'FuelType': fuel_type, 'Price': price}
+
+
+def test_upsert_appends_and_last_row_wins(tmp_path):
+    store = CsvStore(str(tmp_path / 'prices.csv'))
+    store.upsert([row('2025-07-21', 94.7), row('2025-07-21', 87.6, fuel_type='Diesel')])
+    store.upsert([row('2025-07-21', 94.8)])
+    df = store.load()
+    assert len(df) == 2
+    assert df.loc[df['FuelType'] == 'Petrol', 'Price'].tolist() == [94.8]
+    assert [r['Price'] for r in store.rows() if r['FuelType'] == 'Petrol'] == [94.8]
+
+
+def test_upsert_after_a_line_without_newline(tmp_path):
+    path = tmp_path / 'prices.csv'
+    path.write_text('Date,City,FuelType,Price\n2025-07-21,New Delhi,Petrol,94.7')
+    store = CsvStore(str(path))
+    store.upsert([row('2025-07-22', 94.8)])
+    assert store.load()['Price'].tolist() == [94.7, 94.8]
+
+
+def test_read_from_returns_only_appended_rows(tmp_path):
+    store = CsvStore(str(tmp_path / 'prices.csv'))
+    store.upsert([row('2025-07-21', 94.7)])
+    first, offset = store.read_from(0)
+    assert first['Price'].tolist() == [94.7]
+
+    store.upsert([row('2025-07-22', 94.8), row('2025-07-21', 95.0)])
+    appended, new_offset = store.read_from(offset)
+    assert appended['Price'].tolist() == [94.8, 95.0]
+    assert new_offset > offset
+    assert store.read_from(new_offset)[0].empty
+
+
+def test_read_from_holds_back_a_partial_line(tmp_path):
+    path = tmp_path / 'prices.csv'
+    store = CsvStore(str(path))
+    store.upsert([row('2025-07-21', 94.7)])
+    _, offset = store.read_from(0)
+    with open(path, 'a') as f:
+        f.write('2025-07-22,New Delhi,Pet')  # Append still in progress
+    partial, same_offset = store.read_from(offset)
+    assert partial.empty and same_offset == offset
+
+
+def test_data_cache_applies_last_wins_to_appended_rows(tmp_path):
+    store = CsvStore(str(tmp_path / 'prices.csv'))
+    store.upsert([row('2025-07-21', 94.7), row('2025-07-22', 94.8)])
+    cache = DataCache(store)
+    cache.refresh()
+    store.upsert([row('2025-07-22', 99.0)])
+    _, df = cache.refresh()
+    assert cache.incremental_loads == 1
+    assert df['Price'].tolist() == [94.7, 99.0]
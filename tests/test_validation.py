@@ -0,0 +1,72 @@
+# tests/test_validation.py
+import pytest
+
+from validation import CONSENSUS_SOURCES, MIN_OBSERVATIONS, PERSISTENCE_RUNS, Z_THRESHOLD, PriceValidator
+
+CITY, FUEL = 'New Delhi', 'Petrol'
+
+
+@pytest.fixture
+def validator(tmp_path):
+    validator = PriceValidator(str(tmp_path / 'stats.json'))
+    for price in [94.77] * 10:
+        validator.observe(CITY, FUEL, price)
+    return validator
+
+
+def test_series_is_not_scored_until_it_has_history(tmp_path):
+    validator = PriceValidator(str(tmp_path / 'stats.json'))
+    for _ in range(MIN_OBSERVATIONS - 1):
+        validator.observe(CITY, FUEL, 94.77)
+    assert validator.score(CITY, FUEL, 500.0) is None
+    assert validator.check(CITY, FUEL, 500.0, 'acko') == (True, None)
+
+
+def test_score_is_floored_on_a_flat_series(validator):
+    # A flat series has no deviation; the MIN_SCALE floor keeps small moves in range
+    assert validator.score(CITY, FUEL, 94.77) == 0
+    assert validator.score(CITY, FUEL, 95.50) < Z_THRESHOLD
+    assert validator.score(CITY, FUEL, 120.0) > Z_THRESHOLD
+
+
+def test_small_move_is_accepted(validator):
+    accepted, z = validator.check(CITY, FUEL, 95.50, 'acko')
+    assert accepted and z < Z_THRESHOLD
+
+
+def test_anomaly_is_held_back_until_a_second_source_agrees(validator):
+    assert CONSENSUS_SOURCES == 2
+    assert validator.check(CITY, FUEL, 120.0, 'acko')[0] is False
+    assert validator.check(CITY, FUEL, 120.0, 'acko')[0] is False  # The same source again is no consensus
+    assert validator.check(CITY, FUEL, 120.0, 'cardekho')[0] is True
+
+
+def test_anomaly_is_accepted_once_it_persists(validator):
+    for _ in range(PERSISTENCE_RUNS - 1):
+        assert validator.check(CITY, FUEL, 120.0, 'acko')[0] is False
+        validator.finish_run({})
+    assert validator.check(CITY, FUEL, 120.0, 'acko')[0] is True
+
+
+def test_finish_run_tracks_pending_price_and_folds_in_accepted_ones(validator):
+    stats = validator.series[f'{CITY}|{FUEL}']
+    validator.check(CITY, FUEL, 120.0, 'acko')
+    validator.finish_run({})
+    assert (stats['pending'], stats['pending_runs']) == (120.0, 1)
+    assert stats['median'] == 94.77  # Rejected prices leave the statistics alone
+
+    validator.check(CITY, FUEL, 130.0, 'acko')
+    validator.finish_run({})
+    assert (stats['pending'], stats['pending_runs']) == (130.0, 1)  # A different price starts over
+
+    n = stats['n']
+    validator.finish_run({(CITY, FUEL): 120.0})  # A confirmed jump restarts the series at the new level
+    assert stats['n'] == n + 1
+    assert stats['median'] == stats['ewma'] == 120.0
+    assert (stats['pending'], stats['pending_runs']) == (None, 0)
+
+
+def test_statistics_survive_a_restart(validator):
+    validator.save()
+    reloaded = PriceValidator(validator.path)
+    assert reloaded.series == validator.series
@@ -0,0 +1,65 @@
+# trends.py
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ['City', 'FuelType']
+
+# Verdict thresholds (₹)
+CHANGE_THRESHOLD = 0.50        # Window change that counts as a real increase/decrease
+DAILY_CHANGE_THRESHOLD = 0.05  # Average daily change worth mentioning
+
+TREND_DAYS = 7                 # Calendar days covered by the dashboard's and API's trend verdicts
+
+TREND_COLUMNS = ['start_date', 'end_date', 'start_price', 'end_price', 'observations',
+                 'span_days', 'price_change', 'avg_daily_change', 'volatility', 'trend']
+
+
+def _sorted(df):
+    return df[SERIES_KEYS + ['Date', 'Price']].sort_values(SERIES_KEYS + ['Date'], kind='stable')
+
+
+def compute_trends(df, days=TREND_DAYS):
+    """
+    Computes the trend verdict for every (City, FuelType) series in one grouped pass.
+
+    The window is calendar based: it covers the `days` days up to each series'
+    latest date, however many rows that is, so missed days shorten the window
+    instead of silently stretching it. Returns a frame indexed by
+    (City, FuelType) with:
+        start_date/end_date, start_price/end_price - first and last points in the window
+        observations     - rows in the window
+        span_days        - calendar days between the first and last point
+        price_change     - end_price - start_price
+        avg_daily_change - price_change per calendar day
+        volatility       - standard deviation of point-to-point changes
+        trend            - 'increasing', 'decreasing', 'stable' or 'insufficient'
+    """
+    if df.empty:
+        return pd.DataFrame(columns=TREND_COLUMNS,
+                            index=pd.MultiIndex.from_tuples([], names=SERIES_KEYS))
+
+    df = _sorted(df)
+    latest = df.groupby(SERIES_KEYS, observed=True)['Date'].transform('max')
+    window = df[df['Date'] >= latest - pd.Timedelta(days=days)].copy()
+    window['step'] = window.groupby(SERIES_KEYS, observed=True)['Price'].diff()
+
+    table = window.groupby(SERIES_KEYS, observed=True).agg(
+        start_date=('Date', 'first'),
+        end_date=('Date', 'last'),
+        start_price=('Price', 'first'),
+        end_price=('Price', 'last'),
+        observations=('Price', 'size'),
+        volatility=('step', 'std'),
+    )
+    table['span_days'] = (table['end_date'] - table['start_date']).dt.days
+    table['price_change'] = table['end_price'] - table['start_price']
+    table['avg_daily_change'] = table['price_change'] / table['span_days'].where(table['span_days'] > 0)
+    table['trend'] = np.select(
+        [table['observations'] < 2,
+         table['price_change'] > CHANGE_THRESHOLD,
+         table['price_change'] < -CHANGE_THRESHOLD],
+        ['insufficient', 'increasing', 'decreasing'],
+        default='stable',
+    )
+    return table[TREND_COLUMNS]
+
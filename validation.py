@@ -0,0 +1,151 @@
+# validation.py
+import json
+import math
+import os
+import threading
+
+# Running statistics per (City, FuelType), kept between runs; override with FUEL_PRICE_STATS_FILE
+PRICE_STATS_FILE = os.environ.get('FUEL_PRICE_STATS_FILE', '.price_stats.json')
+
+EWMA_ALPHA = 0.2          # Weight of the newest accepted price in the running averages
+MAD_SCALE = 1.4826        # Makes the median absolute deviation comparable to a standard deviation
+MIN_SCALE = 0.02          # Deviation scale floor, as a fraction of the price (series are often flat)
+Z_THRESHOLD = 5.0         # Robust z-score above which a price is an anomaly
+MIN_OBSERVATIONS = 3      # Prices needed before a series is scored at all
+CONSENSUS_SOURCES = 2     # Sources reporting the same anomalous price that make it a real change
+PERSISTENCE_RUNS = 3      # Runs in a row with the same anomalous price that make it a real change
+
+
+class PriceValidator:
+    """
+    Streaming anomaly check for scraped prices. Each (City, FuelType) series
+    keeps an EWMA, a running median and a weighted median absolute deviation.
+    A price far from the median is held back unless CONSENSUS_SOURCES sources
+    report it in one run, or it comes back PERSISTENCE_RUNS runs in a row.
+    """
+
+    def __init__(self, path=PRICE_STATS_FILE):
+        self.path = path
+        self.series = {}
+        self._votes = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self.series = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def empty(self):
+        return not self.series
+
+    @staticmethod
+    def _key(city, fuel_type):
+        return f'{city}|{fuel_type}'
+
+    def _stats(self, city, fuel_type):
+        return self.series.setdefault(self._key(city, fuel_type), {
+            'n': 0,
+            'ewma': None,
+            'median': None,
+            'mad': 0.0,
+            'pending': None,
+            'pending_runs': 0,
+        })
+
+    def score(self, city, fuel_type, price):
+        """
+        Robust z-score of `price` against the series: distance from the running
+        median in units of the scaled MAD (floored at MIN_SCALE of the price
+        level). None while the series has too little history to judge.
+        """
+        stats = self.series.get(self._key(city, fuel_type))
+        if not stats or stats['n'] < MIN_OBSERVATIONS:
+            return None
+        scale = max(MAD_SCALE * stats['mad'], MIN_SCALE * abs(stats['median']))
+        return abs(price - stats['median']) / scale
+
+    def check(self, city, fuel_type, price, source=None):
+        """
+        Returns (accepted, score) for one candidate price. Rejected candidates
+        are remembered as votes for the consensus and persistence checks; the
+        statistics themselves only change in finish_run().
+        """
+        z = self.score(city, fuel_type, price)
+        if z is None or z <= Z_THRESHOLD:
+            return True, z
+        with self._lock:
+            voters = self._votes.setdefault((city, fuel_type), {}).setdefault(round(price, 2), set())
+            if source is not None:
+                voters.add(source)
+            if len(voters) >= CONSENSUS_SOURCES:
+                return True, z
+            stats = self.series[self._key(city, fuel_type)]
+            if stats['pending'] == round(price, 2) and stats['pending_runs'] + 1 >= PERSISTENCE_RUNS:
+                return True, z
+        return False, z
+
+    def update(self, city, fuel_type, price):
+        """
+        Folds an accepted price into its series.
+        """
+        z = self.score(city, fuel_type, price)
+        stats = self._stats(city, fuel_type)
+        if stats['n'] < MIN_OBSERVATIONS or (z is not None and z > Z_THRESHOLD):
+            # Too little history to smooth over, or a confirmed jump: start from this level
+            if stats['median'] is not None:
+                stats['mad'] = (1 - EWMA_ALPHA) * stats['mad'] + EWMA_ALPHA * abs(price - stats['median'])
+            stats['median'] = stats['ewma'] = price
+        else:
+            deviation = price - stats['median']
+            scale = max(MAD_SCALE * stats['mad'], MIN_SCALE * abs(stats['median']))
+            # Stochastic median estimate: step towards the price by a bounded amount
+            stats['median'] += math.copysign(min(abs(deviation), EWMA_ALPHA * scale), deviation)
+            stats['mad'] = (1 - EWMA_ALPHA) * stats['mad'] + EWMA_ALPHA * abs(deviation)
+            stats['ewma'] = (1 - EWMA_ALPHA) * stats['ewma'] + EWMA_ALPHA * price
+        stats['n'] += 1
+        stats['pending'] = None
+        stats['pending_runs'] = 0
+
+    def finish_run(self, accepted):
+        """
+        Ends a run: folds in the accepted prices ({(city, fuel_type): price})
+        and, for series that got none, remembers the most reported rejected
+        price for the persistence check.
+        """
+        for (city, fuel_type), price in accepted.items():
+            self.update(city, fuel_type, price)
+        for (city, fuel_type), votes in self._votes.items():
+            if (city, fuel_type) in accepted:
+                continue
+            price = max(votes, key=lambda candidate: len(votes[candidate]))
+            stats = self._stats(city, fuel_type)
+            stats['pending_runs'] = stats['pending_runs'] + 1 if stats['pending'] == price else 1
+            stats['pending'] = price
+        self._votes.clear()
+
+    def observe(self, city, fuel_type, price):
+        """
+        Streams one historical price through the same check as a live run.
+        Returns whether it was accepted.
+        """
+        accepted, _ = self.check(city, fuel_type, price)
+        self.finish_run({(city, fuel_type): price} if accepted else {})
+        return accepted
+
+    def observe_rows(self, rows):
+        """
+        Builds the statistics from stored history rows (dicts, oldest first).
+        Returns the number of rows rejected as anomalies.
+        """
+        rejected = 0
+        for row in rows:
+            if not self.observe(row['City'], row['FuelType'], float(row['Price'])):
+                rejected += 1
+        return rejected
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.series, f, indent=2)
+        os.replace(tmp_path, self.path)